@@ -0,0 +1,235 @@
+"""Teste de carga da API com o app ASGI real, em processo.
+
+Popula um SQLite em arquivo com `UserFactory`/`TodoFactory` e dispara
+clientes concorrentes (httpx + ASGITransport) que fazem login e então
+alternam listagem, filtro, criação, atualização e remoção de todos.
+Reporta p50/p95/p99 e vazão por endpoint e grava tudo em JSON para
+comparar execuções entre commits.
+
+Uso:
+    python -m benchmarks.load --users 200 --todos-per-user 50 \\
+        --concurrency 20 --requests 200 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from fast_zero.models import TodoState, table_registry
+from tests.conftest import TodoFactory, UserFactory
+
+PASSWORD = 'benchmark'
+STATES = [state.value for state in TodoState]
+
+
+def seed(url: str, users: int, todos_per_user: int) -> list[str]:
+    from fast_zero.security import get_password_hash  # noqa: PLC0415
+
+    engine = create_engine(url)
+    table_registry.metadata.create_all(engine)
+
+    # Um único hash para todos: semear não deve custar um argon2 por usuário
+    password = get_password_hash(PASSWORD)
+    db_users = UserFactory.build_batch(users, password=password)
+
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all(db_users)
+        session.flush()
+
+        for user in db_users:
+            session.add_all(
+                TodoFactory.build_batch(todos_per_user, user_id=user.id)
+            )
+
+        session.commit()
+
+    engine.dispose()
+
+    return [user.username for user in db_users]
+
+
+async def timed(timings, name: str, request):
+    start = time.perf_counter()
+    response = await request
+    timings[name].append((time.perf_counter() - start) * 1000)
+    response.raise_for_status()
+
+    return response
+
+
+async def run_client(app, username: str, requests: int, timings):
+    transport = ASGITransport(app=app)
+
+    async with AsyncClient(
+        transport=transport, base_url='http://test/api'
+    ) as client:
+        response = await timed(
+            timings,
+            'POST /auth/token',
+            client.post(
+                '/auth/token',
+                data={'username': username, 'password': PASSWORD},
+            ),
+        )
+        client.headers['Authorization'] = (
+            f'Bearer {response.json()["access_token"]}'
+        )
+        created = []
+
+        for _ in range(requests):
+            operation = random.choices(
+                ['list', 'filter', 'create', 'update', 'delete'],
+                weights=[50, 20, 15, 10, 5],
+            )[0]
+
+            if operation == 'list':
+                await timed(timings, 'GET /todos', client.get('/todos/'))
+            elif operation == 'filter':
+                await timed(
+                    timings,
+                    'GET /todos?state',
+                    client.get(
+                        '/todos/', params={'state': random.choice(STATES)}
+                    ),
+                )
+            elif operation == 'create' or not created:
+                response = await timed(
+                    timings,
+                    'POST /todos',
+                    client.post(
+                        '/todos/',
+                        json={
+                            'title': 'load',
+                            'description': 'load test',
+                            'state': random.choice(STATES),
+                        },
+                    ),
+                )
+                created.append(response.json()['id'])
+            elif operation == 'update':
+                await timed(
+                    timings,
+                    'PATCH /todos/{id}',
+                    client.patch(
+                        f'/todos/{random.choice(created)}',
+                        json={'state': random.choice(STATES)},
+                    ),
+                )
+            else:
+                await timed(
+                    timings,
+                    'DELETE /todos/{id}',
+                    client.delete(f'/todos/{created.pop()}'),
+                )
+
+
+def percentile(timings: list[float], percent: int) -> float:
+    if len(timings) < 2:  # noqa: PLR2004
+        return timings[0]
+
+    return statistics.quantiles(timings, n=100)[percent - 1]
+
+
+def summarize(timings, elapsed: float) -> dict:
+    return {
+        name: {
+            'requests': len(values),
+            'throughput_rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 50), 3),
+            'p95_ms': round(percentile(values, 95), 3),
+            'p99_ms': round(percentile(values, 99), 3),
+        }
+        for name, values in sorted(timings.items())
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args, usernames: list[str]) -> dict:
+    from fast_zero.app import app  # noqa: PLC0415
+    from fast_zero.database import dispose_engine  # noqa: PLC0415
+
+    timings = defaultdict(list)
+    clients = random.sample(usernames, min(args.concurrency, len(usernames)))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(app, username, args.requests, timings)
+            for username in clients
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    await dispose_engine()
+
+    return {
+        'commit': git_commit(),
+        'config': {
+            'users': args.users,
+            'todos_per_user': args.todos_per_user,
+            'concurrency': len(clients),
+            'requests_per_client': args.requests,
+        },
+        'elapsed_s': round(elapsed, 3),
+        'total_throughput_rps': round(
+            sum(len(values) for values in timings.values()) / elapsed, 1
+        ),
+        'endpoints': summarize(timings, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--todos-per-user', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--output', type=Path, default=Path('load.json'))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f'sqlite:///{tmp}/load.db'
+
+        # Settings são lidas no primeiro uso; o app usa o banco semeado aqui
+        os.environ['DATABASE_URL'] = url
+        os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+        os.environ.setdefault('ACCESS_TOKEN_EXPIRE_MINUTES', '30')
+
+        usernames = seed(url, args.users, args.todos_per_user)
+        results = asyncio.run(run(args, usernames))
+
+    args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    for name, stats in results['endpoints'].items():
+        print(
+            f'{name:<20} {stats["requests"]:6d} req '
+            f'{stats["throughput_rps"]:8.1f} rps  '
+            f'p50 {stats["p50_ms"]:8.2f}  p95 {stats["p95_ms"]:8.2f}  '
+            f'p99 {stats["p99_ms"]:8.2f} ms'
+        )
+
+    print(f'results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
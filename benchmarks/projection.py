@@ -0,0 +1,113 @@
+"""Custo de montar páginas grandes com entidades ORM vs. projeção de colunas.
+
+Compara `select(Todo)`/`select(User)` carregando entidades com a seleção
+só das colunas públicas, usada pelas listagens, incluindo a validação em
+`TodoList`/`UserList`. Mede latência (p50) e memória alocada por página
+(pico do `tracemalloc`).
+
+Uso:
+    python -m benchmarks.projection --rows 1000 --rounds 50
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Todo, TodoState, User, table_registry
+from fast_zero.routers.todos import TODO_PUBLIC_COLUMNS
+from fast_zero.routers.users import USER_PUBLIC_COLUMNS
+from fast_zero.schemas import TodoList, UserList
+from fast_zero.serialization import as_dicts
+
+
+def seed(engine, rows: int):
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    'username': f'user{i}',
+                    'email': f'user{i}@email.com',
+                    'password': '$argon2id$' + 'x' * 90,
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+        conn.execute(
+            insert(Todo),
+            [
+                {
+                    'title': f'title {i}',
+                    'description': f'description {i}',
+                    'state': TodoState.todo,
+                    'user_id': 1,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def measure(engine, load, rounds: int) -> dict[str, float]:
+    timings = []
+
+    for _ in range(rounds):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            load(session)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        load(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    table_registry.metadata.create_all(engine)
+    seed(engine, args.rows)
+
+    loaders = {
+        'todos entity': lambda session: TodoList.model_validate(
+            {'todos': session.scalars(select(Todo)).all()},
+            from_attributes=True,
+        ),
+        'todos columns': lambda session: TodoList.model_validate(
+            {'todos': as_dicts(session.execute(select(*TODO_PUBLIC_COLUMNS)))},
+            from_attributes=True,
+        ),
+        'users entity': lambda session: UserList.model_validate(
+            {'users': session.scalars(select(User)).all()},
+            from_attributes=True,
+        ),
+        'users columns': lambda session: UserList.model_validate(
+            {'users': as_dicts(session.execute(select(*USER_PUBLIC_COLUMNS)))},
+            from_attributes=True,
+        ),
+    }
+
+    for label, load in loaders.items():
+        result = measure(engine, load, args.rounds)
+        print(
+            f'{label:<14} {result["p50_ms"]:9.3f} ms '
+            f'{result["peak_kib"]:9.1f} KiB'
+        )
+
+
+if __name__ == '__main__':
+    main()
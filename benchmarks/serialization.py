@@ -0,0 +1,116 @@
+"""CPU por requisição das listagens, com e sem `FAST_JSON_RESPONSES`.
+
+Chama `GET /api/todos` e `GET /api/users` pelo app real com páginas de
+10 e 100 linhas, em SQLite em memória, e mede o tempo de CPU do processo
+(`time.process_time`) gasto em cada requisição.
+
+Uso:
+    python -m benchmarks.serialization --rounds 500
+"""
+
+import argparse
+import os
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from fast_zero.app import app
+from fast_zero.database import SyncSession, get_session
+from fast_zero.models import Todo, TodoState, User, table_registry
+from fast_zero.security import get_current_user
+from fast_zero.settings import get_settings
+
+PAGE_SIZES = (10, 100)
+
+
+def seed(session: Session, rows: int) -> User:
+    session.execute(
+        insert(User),
+        [
+            {
+                'username': f'user{i}',
+                'email': f'user{i}@email.com',
+                'password': 'x',
+            }
+            for i in range(1, rows + 1)
+        ],
+    )
+    user = session.scalar(select(User).where(User.id == 1))
+    session.execute(
+        insert(Todo),
+        [
+            {
+                'title': f'title {i}',
+                'description': f'description {i}',
+                'state': TodoState.todo,
+                'user_id': user.id,
+            }
+            for i in range(rows)
+        ],
+    )
+    session.commit()
+
+    return user
+
+
+def measure(client: TestClient, url: str, rounds: int) -> float:
+    client.get(url)  # aquecimento
+
+    start = time.process_time()
+    for _ in range(rounds):
+        client.get(url)
+
+    return (time.process_time() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+
+    # Settings são lidas no primeiro uso; dispensa um .env para rodar
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+    os.environ.setdefault('ACCESS_TOKEN_EXPIRE_MINUTES', '30')
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+    settings = get_settings()
+
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool,
+    )
+    table_registry.metadata.create_all(engine)
+
+    with Session(engine, expire_on_commit=False) as session:
+        user = seed(session, max(PAGE_SIZES))
+
+        app.dependency_overrides[get_session] = lambda: SyncSession(session)
+        app.dependency_overrides[get_current_user] = lambda: user
+
+        with TestClient(app) as client:
+            print(f'{"endpoint":<24} {"default":>10} {"fast":>10} {"ratio":>7}')
+
+            for limit in PAGE_SIZES:
+                for url in (
+                    f'/api/todos/?limit={limit}',
+                    f'/api/users/?limit={limit}',
+                ):
+                    results = {}
+                    for label, enabled in (('default', False), ('fast', True)):
+                        settings.FAST_JSON_RESPONSES = enabled
+                        results[label] = measure(client, url, args.rounds)
+
+                    print(
+                        f'{url:<24} {results["default"]:8.3f}ms '
+                        f'{results["fast"]:8.3f}ms '
+                        f'{results["default"] / results["fast"]:6.2f}x'
+                    )
+
+        app.dependency_overrides.clear()
+
+
+if __name__ == '__main__':
+    main()
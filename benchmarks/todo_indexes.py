@@ -0,0 +1,145 @@
+"""Latência de listagem, update e delete de todos com e sem os índices.
+
+Popula um SQLite em arquivo com alguns milhões de todos e mede as mesmas
+consultas feitas por `fast_zero/routers/todos.py`, primeiro sem e depois
+com os índices declarados em `Todo.__table_args__`.
+
+Uso:
+    python -m benchmarks.todo_indexes --todos 2000000 --users 1000
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Todo, TodoState, User, table_registry
+
+STATES = list(TodoState)
+BATCH_SIZE = 50_000
+
+
+def seed(engine, users: int, todos: int):
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    'username': f'user{i}',
+                    'email': f'user{i}@email.com',
+                    'password': 'x',
+                }
+                for i in range(1, users + 1)
+            ],
+        )
+
+        for start in range(0, todos, BATCH_SIZE):
+            conn.execute(
+                insert(Todo),
+                [
+                    {
+                        'title': f'title {i}',
+                        'description': f'description {i}',
+                        'state': random.choice(STATES),
+                        'user_id': random.randint(1, users),
+                    }
+                    for i in range(start, min(start + BATCH_SIZE, todos))
+                ],
+            )
+
+
+def measure(func, rounds: int) -> dict[str, float]:
+    timings = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(statistics.quantiles(timings, n=20)[-1], 3),
+    }
+
+
+def run_queries(engine, users: int, todos: int, rounds: int):
+    def list_todos():
+        user_id = random.randint(1, users)
+        with Session(engine) as session:
+            session.scalars(
+                select(Todo)
+                .where(
+                    Todo.user_id == user_id,
+                    Todo.state == random.choice(STATES),
+                )
+                .order_by(Todo.id)
+                .limit(10)
+            ).all()
+
+    def update_todo():
+        with Session(engine) as session:
+            session.execute(
+                update(Todo)
+                .where(Todo.id == random.randint(1, todos))
+                .values(title='updated')
+            )
+            session.commit()
+
+    def delete_todo():
+        with Session(engine) as session:
+            session.execute(
+                delete(Todo).where(Todo.id == random.randint(1, todos))
+            )
+            session.commit()
+
+    return {
+        'list': measure(list_todos, rounds),
+        'update': measure(update_todo, rounds),
+        'delete': measure(delete_todo, rounds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--todos', type=int, default=2_000_000)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{Path(directory) / "bench.db"}')
+        table_registry.metadata.create_all(engine)
+
+        indexes = Todo.__table__.indexes
+        with engine.begin() as conn:
+            for index in indexes:
+                index.drop(conn)
+
+        seed(engine, args.users, args.todos)
+
+        before = run_queries(engine, args.users, args.todos, args.rounds)
+
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn)
+
+        after = run_queries(engine, args.users, args.todos, args.rounds)
+
+        engine.dispose()
+
+    print(f'{"query":<8} {"before p50/p95 (ms)":>22} {"after p50/p95 (ms)":>22}')
+    for name in before:
+        print(
+            f'{name:<8}'
+            f' {before[name]["p50_ms"]:>10} / {before[name]["p95_ms"]:<9}'
+            f' {after[name]["p50_ms"]:>10} / {after[name]["p95_ms"]:<9}'
+        )
+
+
+if __name__ == '__main__':
+    main()
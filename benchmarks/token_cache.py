@@ -0,0 +1,52 @@
+"""Custo da verificação do token por requisição, com e sem o cache.
+
+Mede `get_token_subject` (a parte de `get_current_user` que valida o JWT)
+reutilizando o mesmo token, como fazem os clientes.
+
+Uso:
+    python -m benchmarks.token_cache --rounds 100000
+"""
+
+import argparse
+import os
+import timeit
+
+from fast_zero.security import (
+    create_access_token,
+    get_token_cache,
+    get_token_subject,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Settings são lidas no primeiro uso; dispensa um .env para rodar
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+    os.environ.setdefault('ALGORITHM', 'HS256')
+    os.environ.setdefault('ACCESS_TOKEN_EXPIRE_MINUTES', '30')
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+    token = create_access_token({'sub': 'benchmark'})
+    token_cache = get_token_cache()
+
+    results = {}
+    for label, maxsize in (('cache off', 0), ('cache on', token_cache.maxsize)):
+        token_cache.clear()
+        token_cache.maxsize = maxsize
+
+        seconds = timeit.timeit(
+            lambda: get_token_subject(token), number=args.rounds
+        )
+        results[label] = seconds / args.rounds * 1_000_000
+
+    for label, microseconds in results.items():
+        print(f'{label:<10} {microseconds:8.2f} us/request')
+
+    print(f'speedup    {results["cache off"] / results["cache on"]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,55 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from http import HTTPStatus
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from fast_zero.database import dispose_engine
+from fast_zero.metrics import InstrumentationMiddleware, metrics
+from fast_zero.purge import run_purge
+from fast_zero.replicas import ReadYourWritesMiddleware, dispose_replicas
 from fast_zero.routers import auth, todos, users
 from fast_zero.schemas import Message
+from fast_zero.security import close_hashing_pool
+from fast_zero.settings import get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Settings, engine e pools são criados sob demanda, no primeiro uso
+    purge = None
+
+    if get_settings().PURGE_ENABLED:
+        purge = asyncio.create_task(run_purge())
+
+    yield
+
+    if purge is not None:
+        purge.cancel()
+        with suppress(asyncio.CancelledError):
+            await purge
+
+    await dispose_engine()
+    await dispose_replicas()
+    close_hashing_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(InstrumentationMiddleware)
+
+
+@app.exception_handler(PoolTimeoutError)
+def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Pool esgotado: responde logo em vez de segurar a requisição
+    return JSONResponse(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        content={'detail': 'Server busy, try again later'},
+        headers={'Retry-After': '1'},
+    )
 
-app = FastAPI()
 
 app.include_router(users.router, prefix='/api')
 app.include_router(auth.router, prefix='/api')
@@ -16,3 +60,12 @@ app.include_router(todos.router, prefix='/api')
 def read_root():
     # Retorna uma resposta simples de "Hello World"
     return {'message': 'hello World'}
+
+
+@app.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    # Formato texto do Prometheus; só existe com a instrumentação ligada
+    if not get_settings().METRICS_ENABLED:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+
+    return metrics.render()
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from functools import lru_cache
+from hashlib import blake2b
+from secrets import token_hex
+from threading import Lock
+from time import monotonic
+from typing import Any, Protocol
+
+from pydantic import BaseModel
+
+from fast_zero.settings import get_settings
+
+# Tempo de vida da geração de cada usuário; maior que o de qualquer entrada
+GENERATION_TTL_SECONDS = 24 * 60 * 60
+
+
+class TTLCache:
+    """Cache LRU em memória, limitado por tamanho e com expiração (TTL).
+
+    Mantém contadores de acertos (`hits`) e falhas (`misses`) para medir a
+    efetividade do cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None or item[0] <= monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+
+        return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses}
+
+
+class CacheBackend(Protocol):
+    """Armazenamento chave/valor assíncrono usado pelo cache de respostas.
+
+    A interface segue o subconjunto de comandos do Redis que o cache usa.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(
+        self, key: str, value: bytes, ex: int, nx: bool = False
+    ) -> bool | None: ...
+
+
+class MemoryBackend:
+    """Backend em memória do processo (LRU com TTL)."""
+
+    def __init__(self, maxsize: int):
+        self.cache = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int, nx: bool = False):
+        if nx and self.cache.get(key) is not None:
+            return None
+
+        self.cache.set(key, value, ttl=ex)
+
+        return True
+
+
+class TodoListCache:
+    """Respostas serializadas de `list_todos` por usuário e filtros.
+
+    Cada usuário tem uma geração aleatória que compõe as chaves das suas
+    entradas. Invalidar é trocar a geração: as entradas antigas ficam
+    inalcançáveis e expiram sozinhas, sem precisar listar chaves no backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def lookup(
+        self, user_id: int, filters: BaseModel
+    ) -> tuple[str | None, tuple[str, bytes] | None]:
+        """Devolve a chave para gravar a página e a entrada em cache, se houver.
+
+        A geração é lida antes da consulta ao banco; se uma escrita trocá-la
+        no meio do caminho, a página gravada fica numa geração já descartada.
+        """
+        generation_key = f'todos:{user_id}:generation'
+        generation = await self.backend.get(generation_key)
+
+        if generation is None:
+            generation = token_hex(8).encode()
+
+            if not await self.backend.set(
+                generation_key, generation, ex=GENERATION_TTL_SECONDS, nx=True
+            ):
+                # Outra requisição definiu a geração antes; não grava nada
+                return None, None
+
+        digest = blake2b(
+            filters.model_dump_json().encode(), digest_size=16
+        ).hexdigest()
+        key = f'todos:{user_id}:{generation.decode()}:{digest}'
+
+        cached = await self.backend.get(key)
+
+        if cached is None:
+            return key, None
+
+        etag, body = cached.split(b'\n', 1)
+
+        return key, (etag.decode(), body)
+
+    async def store(self, key: str, etag: str, body: bytes):
+        await self.backend.set(key, etag.encode() + b'\n' + body, ex=self.ttl)
+
+    async def invalidate(self, user_id: int):
+        await self.backend.set(
+            f'todos:{user_id}:generation',
+            token_hex(8).encode(),
+            ex=GENERATION_TTL_SECONDS,
+        )
+
+
+@lru_cache
+def get_todo_list_cache() -> TodoListCache | None:
+    settings = get_settings()
+
+    if settings.RESPONSE_CACHE_BACKEND == 'memory':
+        backend = MemoryBackend(maxsize=settings.RESPONSE_CACHE_SIZE)
+    elif settings.RESPONSE_CACHE_BACKEND == 'redis':
+        # Dependência opcional, só necessária com este backend
+        from redis.asyncio import Redis  # noqa: PLC0415
+
+        backend = Redis.from_url(settings.RESPONSE_CACHE_URL)
+    else:
+        return None
+
+    return TodoListCache(backend, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+async def invalidate_todo_lists(user_id: int):
+    cache = get_todo_list_cache()
+
+    if cache is not None:
+        await cache.invalidate(user_id)
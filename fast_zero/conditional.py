@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+
+
+def make_etag(*parts) -> str:
+    """ETag fraca derivada das partes que identificam a versão do recurso."""
+    digest = blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparação fraca entre o `If-None-Match` recebido e a ETag atual."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    return any(
+        tag.strip().removeprefix('W/') == etag.removeprefix('W/')
+        for tag in if_none_match.split(',')
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # O banco grava timestamps sem fuso, em UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def not_modified_since(
+    if_modified_since: str | None, last_modified: datetime
+) -> bool:
+    if not if_modified_since:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    # Datas HTTP têm resolução de segundos
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
@@ -0,0 +1,108 @@
+"""Contadores de todos por estado e versão por usuário, mantidos por triggers.
+
+Os triggers rodam na mesma transação do INSERT/UPDATE/DELETE em `todos`,
+então cobrem tanto os endpoints unitários quanto os de lote. O resumo por
+estado vira uma leitura de no máximo cinco linhas por usuário, e a versão
+(que muda a cada escrita) dá a ETag da listagem com uma leitura de uma linha.
+Os triggers ficam em `triggers`, registrados junto com a tabela `todos`.
+
+Verificação e reconstrução:
+    python -m fast_zero.counters check
+    python -m fast_zero.counters rebuild
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import create_engine, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Todo, TodoCount, TodoState
+from fast_zero.settings import get_settings
+
+
+def count_todos(user_id: int | None = None):
+    """Contagem real, com `GROUP BY` sobre `todos`."""
+    query = select(Todo.user_id, Todo.state, func.count()).group_by(
+        Todo.user_id, Todo.state
+    )
+
+    if user_id is not None:
+        query = query.where(Todo.user_id == user_id)
+
+    return query
+
+
+def summarize(rows) -> dict[str, int]:
+    summary = dict.fromkeys((state.value for state in TodoState), 0)
+
+    for state, count in rows:
+        summary[state.value] = count
+
+    return summary
+
+
+def check_todo_counts(session: Session) -> list[tuple]:
+    """Divergências (user_id, estado, contador, real) entre contadores e todos."""
+    actual = {
+        (user_id, state): count
+        for user_id, state, count in session.execute(count_todos())
+    }
+    stored = {
+        (row.user_id, row.state): row.count
+        for row in session.scalars(select(TodoCount))
+    }
+
+    mismatches = []
+
+    for user_id, state in sorted(actual.keys() | stored.keys()):
+        counter = stored.get((user_id, state), 0)
+        real = actual.get((user_id, state), 0)
+
+        if counter != real:
+            mismatches.append((user_id, state.value, counter, real))
+
+    return mismatches
+
+
+def rebuild_todo_counts(session: Session, user_id: int | None = None):
+    """Recalcula os contadores a partir de `todos`, na transação da sessão."""
+    query = delete(TodoCount)
+
+    if user_id is not None:
+        query = query.where(TodoCount.user_id == user_id)
+
+    session.execute(query)
+    session.execute(
+        insert(TodoCount).from_select(
+            ['user_id', 'state', 'count'], count_todos(user_id)
+        )
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['check', 'rebuild'])
+    args = parser.parse_args(argv)
+
+    engine = create_engine(get_settings().DATABASE_URL)
+
+    with Session(engine) as session:
+        if args.command == 'rebuild':
+            rebuild_todo_counts(session)
+            session.commit()
+
+        mismatches = check_todo_counts(session)
+
+    engine.dispose()
+
+    for user_id, state, stored, actual in mismatches:
+        print(f'user {user_id} {state}: counter {stored}, actual {actual}')
+
+    print(f'{len(mismatches)} mismatched counters')
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
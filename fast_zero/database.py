@@ -1,11 +1,225 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter
+
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from fast_zero.settings import get_settings
+
+# Driver assíncrono usado quando a URL não informa um explicitamente
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'psycopg'}
+MEMORY_DATABASES = {None, '', ':memory:'}
+
+
+def get_async_url(url: str) -> URL:
+    url = make_url(url)
+
+    if '+' in url.drivername:
+        return url
+
+    driver = ASYNC_DRIVERS[url.drivername]
+
+    return url.set(drivername=f'{url.drivername}+{driver}')
+
+
+class PoolMetrics:
+    """Contadores de checkout e tempo de espera por conexões do pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = Lock()
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'wait_seconds_total': self.wait_seconds_total,
+            'wait_seconds_max': self.wait_seconds_max,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredPoolMixin:
+    def connect(self):
+        start = perf_counter()
+
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+
+        pool_metrics.record_checkout(perf_counter() - start)
+
+        return connection
+
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_engine_options(url: URL, is_async: bool) -> dict:
+    """Parâmetros de pool e conexão do engine, lidos das Settings."""
+    settings = get_settings()
+
+    if url.get_backend_name() == 'sqlite' and url.database in MEMORY_DATABASES:
+        # Banco em memória vive numa conexão só; mantém o pool padrão
+        return {}
+
+    options = {
+        'poolclass': MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT_MS
+
+    if timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+
+    return options
+
+
+def _in_threadpool(name: str):
+    async def method(self, *args, **kwargs):
+        return await run_in_threadpool(
+            getattr(self.sync_session, name), *args, **kwargs
+        )
+
+    method.__name__ = name
+
+    return method
+
+
+class SyncStreamResult:
+    """Resultado em streaming com a interface do AsyncScalarResult."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def partitions(self, size: int | None = None):
+        return iterate_in_threadpool(self.result.partitions(size))
+
+
+class SyncSession:
+    """Expõe uma Session síncrona com a mesma interface da AsyncSession.
+
+    Os handlers são `async def` e sempre fazem `await` nas operações de
+    banco; aqui cada operação bloqueante roda no threadpool do Starlette.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def stream_scalars(self, statement, *args, **kwargs):
+        result = await run_in_threadpool(
+            self.sync_session.scalars, statement, *args, **kwargs
+        )
+
+        return SyncStreamResult(result)
+
+    execute = _in_threadpool('execute')
+    scalar = _in_threadpool('scalar')
+    scalars = _in_threadpool('scalars')
+    get = _in_threadpool('get')
+    merge = _in_threadpool('merge')
+    delete = _in_threadpool('delete')
+    connection = _in_threadpool('connection')
+    flush = _in_threadpool('flush')
+    refresh = _in_threadpool('refresh')
+    commit = _in_threadpool('commit')
+    rollback = _in_threadpool('rollback')
+    close = _in_threadpool('close')
+
+
+def build_engine(database_url: str) -> AsyncEngine | Engine:
+    if get_settings().DATABASE_ASYNC:
+        url = get_async_url(database_url)
+        return create_async_engine(url, **get_engine_options(url, is_async=True))
+
+    url = make_url(database_url)
+    return create_engine(url, **get_engine_options(url, is_async=False))
+
+
+@lru_cache
+def get_engine() -> AsyncEngine | Engine:
+    """Cria o engine no primeiro uso, já dentro do worker."""
+    return build_engine(get_settings().DATABASE_URL)
+
+
+async def dispose(engine: AsyncEngine | Engine):
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    else:
+        await run_in_threadpool(engine.dispose)
+
+
+async def dispose_engine():
+    if not get_engine.cache_info().currsize:
+        return
+
+    engine = get_engine()
+    get_engine.cache_clear()
+
+    await dispose(engine)
 
-from fast_zero.settings import Settings
 
-engine = create_engine(Settings().DATABASE_URL)
+@asynccontextmanager
+async def session_scope(engine: AsyncEngine | Engine):
+    if isinstance(engine, AsyncEngine):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    else:
+        session = SyncSession(Session(engine, expire_on_commit=False))
+        try:
+            yield session
+        finally:
+            await session.close()
 
 
-def get_session():  # pragma: no cover
-    with Session(engine) as session:
+async def get_session():  # pragma: no cover
+    async with session_scope(get_engine()) as session:
         yield session
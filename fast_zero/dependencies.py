@@ -1,22 +1,38 @@
+from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import Query
+from fastapi import HTTPException, Query
 
 from fast_zero.models import TodoState
+from fast_zero.pagination import decode_cursor
 from fast_zero.schemas import TodoFilters
 
 
-def get_filters(
+def get_filters(  # noqa: PLR0913, PLR0917
     title: Annotated[str | None, Query()] = None,
     description: Annotated[str | None, Query()] = None,
     state: Annotated[TodoState | None, Query()] = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0, le=100)] = 10,
+    cursor: Annotated[str | None, Query()] = None,
+    q: Annotated[str | None, Query(min_length=1)] = None,
 ) -> TodoFilters:
+    after_id = None
+
+    if cursor:
+        try:
+            after_id = int(decode_cursor(cursor)['id'])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+            )
+
     return TodoFilters(
         title=title,
         description=description,
         state=state,
         offset=offset,
         limit=limit,
+        after_id=after_id,
+        q=q,
     )
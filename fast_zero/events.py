@@ -0,0 +1,162 @@
+import asyncio
+import json
+from functools import lru_cache
+from typing import Protocol
+
+from fast_zero.schemas import TodoPublic
+from fast_zero.settings import get_settings
+
+# Enviado no lugar dos eventos descartados: o cliente deve ressincronizar
+RESYNC_EVENT = {'type': 'resync'}
+CHANNEL_PREFIX = 'todos:events:'
+
+
+class Subscription:
+    """Fila limitada de eventos de uma conexão.
+
+    Um consumidor lento não segura o publicador: quando a fila enche, os
+    eventos pendentes são trocados por um único `resync`, e o cliente busca
+    o estado em `GET /api/todos/changes`.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class Broker(Protocol):
+    """Distribui eventos de todos para as conexões de cada usuário."""
+
+    async def publish(self, user_id: int, event: dict): ...
+
+    def subscribe(self, user_id: int) -> Subscription: ...
+
+    def unsubscribe(self, user_id: int, subscription: Subscription): ...
+
+
+class LocalBroker:
+    """Fan-out em memória, para as conexões deste processo."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscriptions: dict[int, set[Subscription]] = {}
+
+    async def publish(self, user_id: int, event: dict):
+        self.deliver(user_id, event)
+
+    def deliver(self, user_id: int, event: dict):
+        for subscription in self.subscriptions.get(user_id, ()):
+            subscription.put(event)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        self.subscriptions.setdefault(user_id, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, user_id: int, subscription: Subscription):
+        subscriptions = self.subscriptions.get(user_id, set())
+        subscriptions.discard(subscription)
+
+        if not subscriptions:
+            self.subscriptions.pop(user_id, None)
+
+
+class RedisBroker:
+    """Compartilha eventos entre workers via pub/sub do Redis.
+
+    Cada worker assina um padrão único e repassa as mensagens ao fan-out
+    local; publicar é só um `PUBLISH`, inclusive para o próprio worker.
+    """
+
+    def __init__(self, client, queue_size: int):
+        self.client = client
+        self.local = LocalBroker(queue_size)
+        self._listener: asyncio.Task | None = None
+
+    async def publish(self, user_id: int, event: dict):
+        await self.client.publish(f'{CHANNEL_PREFIX}{user_id}', json.dumps(event))
+
+    def subscribe(self, user_id: int) -> Subscription:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self.listen())
+
+        return self.local.subscribe(user_id)
+
+    def unsubscribe(self, user_id: int, subscription: Subscription):
+        self.local.unsubscribe(user_id, subscription)
+
+    async def listen(self):
+        pubsub = self.client.pubsub()
+        await pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+
+        async for message in pubsub.listen():
+            if message['type'] != 'pmessage':
+                continue
+
+            channel = message['channel']
+
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+
+            user_id = int(channel.removeprefix(CHANNEL_PREFIX))
+            self.local.deliver(user_id, json.loads(message['data']))
+
+
+@lru_cache
+def get_broker() -> Broker:
+    settings = get_settings()
+
+    if settings.EVENTS_BROKER == 'redis':
+        # Dependência opcional, só necessária com este broker
+        from redis.asyncio import Redis  # noqa: PLC0415
+
+        return RedisBroker(
+            Redis.from_url(settings.EVENTS_BROKER_URL),
+            queue_size=settings.EVENTS_QUEUE_SIZE,
+        )
+
+    return LocalBroker(queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+async def publish_todo_event(user_id: int, type_: str, todos=(), ids=()):
+    """Publica `created`/`updated` (com os todos) ou `deleted` (com os ids)."""
+    event = {'type': type_}
+
+    if todos:
+        event['todos'] = [
+            TodoPublic.model_validate(todo, from_attributes=True).model_dump(
+                mode='json'
+            )
+            for todo in todos
+        ]
+    if ids:
+        event['ids'] = list(ids)
+
+    await get_broker().publish(user_id, event)
+
+
+async def event_stream(subscription: Subscription, keepalive: float):
+    """Formata os eventos como SSE, com comentários de keep-alive."""
+    yield ': connected\n\n'
+
+    while True:
+        try:
+            event = await asyncio.wait_for(subscription.get(), keepalive)
+        except TimeoutError:
+            # Mantém a conexão viva através de proxies
+            yield ': keep-alive\n\n'
+            continue
+
+        yield f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
@@ -0,0 +1,107 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt import PyJWK
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from jwt.exceptions import InvalidKeyError
+
+from fast_zero.settings import get_settings
+
+# Algoritmos assimétricos aceitos no conjunto de chaves
+KEY_ALGORITHMS = {'RS256': RSAAlgorithm, 'EdDSA': OKPAlgorithm}
+
+
+class KeySet:
+    """Chaves de assinatura de JWT indexadas pelo `kid` (formato JWKS).
+
+    Nós que emitem tokens carregam as chaves privadas; nós que só
+    verificam precisam apenas das públicas. Várias chaves ficam ativas ao
+    mesmo tempo, o que permite rotacionar a de assinatura sem invalidar os
+    tokens já emitidos.
+    """
+
+    def __init__(self, jwks: dict, signing_kid: str | None = None):
+        self.keys = {}
+        # Chaves públicas já convertidas, prontas para a verificação
+        self.public_keys = {}
+
+        for data in jwks['keys']:
+            if data.get('alg') not in KEY_ALGORITHMS or not data.get('kid'):
+                raise InvalidKeyError('Keys must have a kid and RS256/EdDSA alg')
+
+            jwk = PyJWK(data)
+            self.keys[data['kid']] = jwk
+            self.public_keys[data['kid']] = (
+                jwk.key.public_key() if _is_private(jwk) else jwk.key
+            )
+
+        self.signing_kid = signing_kid or next(
+            (kid for kid, jwk in self.keys.items() if _is_private(jwk)), None
+        )
+
+    @classmethod
+    def from_file(cls, path: str, signing_kid: str | None = None):
+        return cls(
+            json.loads(Path(path).read_text(encoding='utf-8')), signing_kid
+        )
+
+    def signing_key(self) -> PyJWK:
+        jwk = self.keys.get(self.signing_kid)
+
+        if jwk is None or not _is_private(jwk):
+            raise InvalidKeyError('No private key available for signing')
+
+        return jwk
+
+    def verification_key(self, kid: str | None):
+        """Devolve `(chave pública, algoritmo)` para o `kid` do token."""
+        if kid not in self.public_keys:
+            raise InvalidKeyError(f'Unknown key id: {kid}')
+
+        return self.public_keys[kid], self.keys[kid].algorithm_name
+
+    def public_jwks(self) -> dict:
+        keys = []
+
+        for kid, jwk in self.keys.items():
+            keys.append({
+                **jwk.Algorithm.to_jwk(self.public_keys[kid], as_dict=True),
+                'kid': kid,
+                'alg': jwk.algorithm_name,
+                'use': 'sig',
+            })
+
+        return {'keys': keys}
+
+
+def _is_private(jwk: PyJWK) -> bool:
+    return hasattr(jwk.key, 'public_key')
+
+
+def generate_jwk(kid: str, algorithm: str = 'EdDSA') -> dict:
+    """Gera uma chave privada nova, no formato JWK, para o conjunto."""
+    if algorithm == 'RS256':
+        private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+
+    return {
+        **KEY_ALGORITHMS[algorithm].to_jwk(private_key, as_dict=True),
+        'kid': kid,
+        'alg': algorithm,
+    }
+
+
+@lru_cache
+def get_key_set() -> KeySet | None:
+    """Conjunto de chaves de `JWT_KEYS_FILE`; None usa o SECRET_KEY (HMAC)."""
+    settings = get_settings()
+
+    if not settings.JWT_KEYS_FILE:
+        return None
+
+    return KeySet.from_file(settings.JWT_KEYS_FILE, settings.JWT_SIGNING_KID)
@@ -0,0 +1,295 @@
+import logging
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from fast_zero.cache import MemoryBackend, get_todo_list_cache
+from fast_zero.database import pool_metrics
+from fast_zero.profiling import finish_sampler, start_sampler
+from fast_zero.replicas import get_replica_set
+from fast_zero.security import get_principal_cache, get_token_cache
+from fast_zero.settings import get_settings
+
+# Limites superiores (em segundos) dos buckets de latência
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)  # fmt: skip
+# Limites dos buckets de statements por requisição (N+1 aparece na cauda)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+# Rotas não encontradas compartilham um rótulo para não explodir séries
+UNMATCHED_ROUTE = '<unmatched>'
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Statements executados e tempo de banco da requisição corrente."""
+
+    __slots__ = ('db_seconds', 'scope', 'statements')
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Objeto mutável: a sessão síncrona roda em threads com cópias do contexto
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    'request_stats', default=None
+)
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus, por conjunto de rótulos."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.series: dict[tuple, tuple[list[int], float]] = {}
+        self._lock = Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            counts, total = self.series.get(labels, (None, 0.0))
+
+            if counts is None:
+                # Um contador por bucket mais o +Inf
+                counts = [0] * (len(self.buckets) + 1)
+
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[labels] = (counts, total + value)
+
+    def render(self, name: str, label_names: tuple[str, ...]) -> list[str]:
+        lines = [f'# TYPE {name} histogram']
+
+        with self._lock:
+            series = sorted(self.series.items())
+
+        for labels, (counts, total) in series:
+            label_text = ','.join(
+                f'{key}="{value}"' for key, value in zip(label_names, labels)
+            )
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}'
+                )
+
+            lines.extend((
+                f'{name}_sum{{{label_text}}} {total}',
+                f'{name}_count{{{label_text}}} {cumulative}',
+            ))
+
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+
+    def record(self, labels: tuple, seconds: float, stats: RequestStats):
+        self.latency.observe(labels, seconds)
+        self.db_time.observe(labels, stats.db_seconds)
+        self.statements.observe(labels, stats.statements)
+
+    def render(self) -> str:
+        labels = ('method', 'route', 'status')
+        lines = [
+            *self.latency.render('http_request_duration_seconds', labels),
+            *self.db_time.render('http_request_db_seconds', labels),
+            *self.statements.render('http_request_db_statements', labels),
+        ]
+
+        for name, value in pool_metrics.snapshot().items():
+            lines.extend((
+                f'# TYPE db_pool_{name} gauge',
+                f'db_pool_{name} {value}',
+            ))
+
+        replicas = get_replica_set()
+
+        if replicas is not None:
+            lines.append('# TYPE db_replica_up gauge')
+            lines.extend(
+                f'db_replica_up{{replica="{index}"}} {int(up)}'
+                for index, up in enumerate(replicas.health())
+            )
+
+        caches = {
+            'principal': get_principal_cache(),
+            'token': get_token_cache(),
+        }
+        todo_list_cache = get_todo_list_cache()
+
+        # No Redis as estatísticas ficam no próprio servidor
+        if todo_list_cache is not None and isinstance(
+            todo_list_cache.backend, MemoryBackend
+        ):
+            caches['todo_list'] = todo_list_cache.backend.cache
+
+        for name, cache in caches.items():
+            for key, value in cache.stats().items():
+                lines.append(f'cache_{key}{{cache="{name}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def parameter_shape(parameters, many: bool = False):
+    """Tipos dos parâmetros, sem os valores (que podem ter dados pessoais)."""
+    if not parameters:
+        return []
+
+    if many:
+        return f'{len(parameters)} x {parameter_shape(parameters[0])}'
+
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+
+    return [type(value).__name__ for value in parameters]
+
+
+def before_cursor_execute(conn, *args):
+    conn.info.setdefault('query_start', []).append(perf_counter())
+
+
+def after_cursor_execute(  # noqa: PLR0913, PLR0917
+    conn, cursor, statement, parameters, context, many
+):
+    if not conn.info.get('query_start'):
+        return
+
+    elapsed = perf_counter() - conn.info['query_start'].pop()
+    stats = request_stats.get()
+
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+    threshold = get_settings().SLOW_QUERY_THRESHOLD_MS
+
+    if threshold is not None and elapsed * 1000 >= threshold:
+        logger.warning(
+            'slow query %.1fms route=%s params=%s sql=%s',
+            elapsed * 1000,
+            route_label(stats.scope) if stats is not None else None,
+            parameter_shape(parameters, many),
+            ' '.join(statement.split()),
+        )
+
+
+@lru_cache
+def install_query_hooks():
+    """Registra os hooks em todas as engines (inclusive a síncrona da async)."""
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def route_label(scope) -> str:
+    """Template da rota (`/api/todos/{todo_id}`) a partir do path real.
+
+    O `route.path` nem sempre inclui o prefixo do `include_router`, então o
+    template é remontado trocando os valores dos parâmetros pelos nomes.
+    """
+    if 'endpoint' not in scope:
+        return UNMATCHED_ROUTE
+
+    names = {str(value): name for name, value in scope['path_params'].items()}
+
+    return '/'.join(
+        f'{{{names[segment]}}}' if segment in names else segment
+        for segment in scope['path'].split('/')
+    )
+
+
+class InstrumentationMiddleware:
+    """Mede latência, statements e tempo de banco por template de rota.
+
+    Cada recurso é opcional e, desligado, não custa nada além de uma leitura
+    das settings: `METRICS_ENABLED` (header `Server-Timing` e
+    `GET /metrics`), `SLOW_QUERY_THRESHOLD_MS` (log de queries lentas) e
+    `PROFILE_SAMPLE_RATE` (pilhas das requisições acima do orçamento).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        settings = get_settings()
+        track_queries = (
+            settings.METRICS_ENABLED
+            or settings.SLOW_QUERY_THRESHOLD_MS is not None
+        )
+
+        if scope['type'] != 'http' or not (
+            track_queries or settings.PROFILE_SAMPLE_RATE
+        ):
+            return await self.app(scope, receive, send)
+
+        if track_queries:
+            install_query_hooks()
+
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        sampler = start_sampler(settings)
+        start = perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+                if settings.METRICS_ENABLED:
+                    elapsed = (perf_counter() - start) * 1000
+                    timing = (
+                        f'app;dur={elapsed:.2f}, '
+                        f'db;dur={stats.db_seconds * 1000:.2f};'
+                        f'desc="{stats.statements} statements"'
+                    )
+                    message['headers'] = [
+                        *message.get('headers', []),
+                        (b'server-timing', timing.encode()),
+                    ]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            elapsed = perf_counter() - start
+            labels = (scope['method'], route_label(scope), status)
+
+            if settings.METRICS_ENABLED:
+                metrics.record(labels, elapsed, stats)
+
+            if sampler is not None:
+                # O join e a escrita em disco não podem travar o event loop
+                path = await run_in_threadpool(
+                    finish_sampler,
+                    sampler,
+                    settings,
+                    elapsed,
+                    ' '.join(labels[:2]),
+                )
+
+                if path is not None:
+                    logger.warning(
+                        'slow request %.1fms %s %s, stacks in %s',
+                        elapsed * 1000,
+                        *labels[:2],
+                        path,
+                    )
@@ -1,9 +1,11 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func, literal_column, text
 from sqlalchemy.orm import Mapped, mapped_column, registry
 
+from fast_zero.triggers import register_triggers
+
 table_registry = registry()
 
 
@@ -18,22 +20,72 @@ class TodoState(str, Enum):
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    # Únicos só entre os ativos: o usuário removido libera nome e e-mail na
+    # hora, sem esperar o expurgo
+    __table_args__ = (
+        Index(
+            'ix_users_username_active',
+            'username',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+            postgresql_where=text('deleted_at IS NULL'),
+        ),
+        Index(
+            'ix_users_email_active',
+            'email',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+            postgresql_where=text('deleted_at IS NULL'),
+        ),
+    )
+    # Lê as colunas geradas pelo banco no próprio INSERT/UPDATE (RETURNING)
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    username: Mapped[str] = mapped_column(unique=True)
+    username: Mapped[str]
     password: Mapped[str]
-    email: Mapped[str] = mapped_column(unique=True)
+    email: Mapped[str]
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # Exclusão lógica: o expurgo remove o usuário e seus todos depois
+    deleted_at: Mapped[datetime | None] = mapped_column(init=False, default=None)
+
+
+# Condição dos índices parciais; as consultas precisam do mesmo literal
+TRASH_CONDITION = "state = 'trash'"
+LIVE_CONDITION = "state != 'trash'"
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todos'
+    __table_args__ = (
+        # Toda consulta filtra por usuário; a maioria também por estado
+        Index('ix_todos_user_id_state_id', 'user_id', 'state', 'id'),
+        Index('ix_todos_user_id_created_at', 'user_id', 'created_at'),
+        # Sincronização incremental: keyset por (updated_at, id)
+        Index('ix_todos_user_id_updated_at_id', 'user_id', 'updated_at', 'id'),
+        # Listagem sem filtro de estado ignora a lixeira pelo índice parcial
+        Index(
+            'ix_todos_user_id_id_live',
+            'user_id',
+            'id',
+            sqlite_where=text(LIVE_CONDITION),
+            postgresql_where=text(LIVE_CONDITION),
+        ),
+        # O expurgo só percorre a lixeira
+        Index(
+            'ix_todos_trash_updated_at',
+            'updated_at',
+            sqlite_where=text(TRASH_CONDITION),
+            postgresql_where=text(TRASH_CONDITION),
+        ),
+    )
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
@@ -48,3 +100,54 @@ class Todo:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+
+
+# Junto da tabela, para que todo `create_all` crie também os triggers
+register_triggers(Todo.__table__)
+
+# Filtros que casam com os índices parciais: o estado vai como literal, não
+# como parâmetro, senão o SQLite não usa o índice
+TRASHED = Todo.state == literal_column("'trash'")
+NOT_TRASHED = Todo.state != literal_column("'trash'")
+
+
+@table_registry.mapped_as_dataclass
+class TodoCount:
+    """Total de todos por usuário e estado, mantido por triggers em `todos`."""
+
+    __tablename__ = 'todo_counts'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), primary_key=True)
+    state: Mapped[TodoState] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoVersion:
+    """Versão dos todos de cada usuário, incrementada por triggers em `todos`."""
+
+    __tablename__ = 'todo_versions'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoTombstone:
+    """Todos removidos, gravados por trigger, para a sincronização incremental."""
+
+    __tablename__ = 'todo_tombstones'
+    __table_args__ = (
+        Index(
+            'ix_todo_tombstones_user_id_deleted_at_id',
+            'user_id',
+            'deleted_at',
+            'id',
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
@@ -0,0 +1,24 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+
+def encode_cursor(values: dict) -> str:
+    """Gera um cursor opaco a partir da posição do último item da página."""
+    payload = json.dumps(values, separators=(',', ':')).encode()
+
+    return urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Lê um cursor gerado por `encode_cursor`; levanta ValueError se inválido."""
+    try:
+        payload = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (BinasciiError, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError('Invalid cursor') from error
+
+    if not isinstance(values, dict):
+        raise ValueError('Invalid cursor')
+
+    return values
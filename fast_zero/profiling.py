@@ -0,0 +1,88 @@
+import sys
+from collections import Counter
+from itertools import count
+from pathlib import Path
+from threading import Event, Thread, get_ident
+from time import time
+
+# Contador global para amostrar 1 a cada N requisições
+_requests = count(1)
+
+
+def fold_stack(frame) -> str:
+    """Pilha no formato "collapsed" (raiz;...;folha) do flamegraph.pl."""
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+        frame = frame.f_back
+
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """Amostra periodicamente a pilha de uma thread em uma thread auxiliar.
+
+    Amostra a thread do event loop: outras tarefas rodando ao mesmo tempo
+    aparecem junto, e o trabalho feito no threadpool não aparece.
+    """
+
+    def __init__(self, interval: float, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id or get_ident()
+        self.stacks = Counter()
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+
+            if frame is not None:
+                self.stacks[fold_stack(frame)] += 1
+
+    def dump(self, directory: str, label: str) -> Path:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+
+        name = ''.join(char if char.isalnum() else '_' for char in label)
+        path /= f'{int(time() * 1000)}-{name.strip("_")}.folded'
+        path.write_text(
+            ''.join(f'{stack} {hits}\n' for stack, hits in self.stacks.items()),
+            encoding='utf-8',
+        )
+
+        return path
+
+
+def start_sampler(settings) -> StackSampler | None:
+    """Inicia o sampler se esta requisição cair na amostragem 1-em-N."""
+    rate = settings.PROFILE_SAMPLE_RATE
+
+    if not rate or next(_requests) % rate:
+        return None
+
+    return StackSampler(settings.PROFILE_INTERVAL_MS / 1000).start()
+
+
+def finish_sampler(sampler: StackSampler, settings, elapsed: float, label: str):
+    """Para o sampler e grava as pilhas se a requisição passou do orçamento.
+
+    Bloqueia (join da thread e escrita em disco): rode fora do event loop.
+    """
+    sampler.stop()
+
+    if elapsed * 1000 < settings.PROFILE_BUDGET_MS:
+        return None
+
+    return sampler.dump(settings.PROFILE_OUTPUT_DIR, label)
@@ -0,0 +1,128 @@
+"""Expurgo em segundo plano de todos na lixeira e de usuários removidos.
+
+Remove em lotes limitados (`PURGE_BATCH_SIZE`), com uma pausa entre eles
+(`PURGE_INTERVAL_SECONDS`) para não disputar o banco com as requisições.
+Roda junto do app (`PURGE_ENABLED`) ou como processo separado:
+    python -m fast_zero.purge
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from fast_zero.cache import invalidate_todo_lists
+from fast_zero.database import dispose_engine, get_session
+from fast_zero.models import (
+    TRASHED,
+    Todo,
+    TodoCount,
+    TodoTombstone,
+    TodoVersion,
+    User,
+)
+from fast_zero.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_trash(session, batch_size: int, older_than: timedelta) -> int:
+    """Apaga um lote de todos que estão na lixeira há mais de `older_than`."""
+    cutoff = datetime.now(UTC).replace(tzinfo=None) - older_than
+
+    # Percorre só o índice parcial da lixeira. As condições se repetem no
+    # DELETE: um todo restaurado entre a escolha e a remoção fica de fora
+    trashed = (TRASHED, Todo.updated_at < cutoff)
+    batch = select(Todo.id).where(*trashed).limit(batch_size)
+    user_ids = await session.scalars(
+        delete(Todo).where(Todo.id.in_(batch), *trashed).returning(Todo.user_id)
+    )
+    user_ids = user_ids.all()
+
+    if not user_ids:
+        return 0
+
+    await session.commit()
+
+    for user_id in set(user_ids):
+        await invalidate_todo_lists(user_id)
+
+    return len(user_ids)
+
+
+async def purge_deleted_user(session, batch_size: int) -> int:
+    """Apaga um lote dos todos de um usuário removido, e por fim o usuário."""
+    user_id = await session.scalar(
+        select(User.id).where(User.deleted_at.is_not(None)).limit(1)
+    )
+
+    if user_id is None:
+        return 0
+
+    ids = await session.scalars(
+        select(Todo.id).where(Todo.user_id == user_id).limit(batch_size)
+    )
+    ids = ids.all()
+
+    if ids:
+        await session.execute(delete(Todo).where(Todo.id.in_(ids)))
+        await session.commit()
+
+        return len(ids)
+
+    for model in (TodoCount, TodoTombstone, TodoVersion):
+        await session.execute(delete(model).where(model.user_id == user_id))
+
+    await session.execute(delete(User).where(User.id == user_id))
+    await session.commit()
+
+    return 1
+
+
+async def purge_once(session, settings) -> int:
+    """Um ciclo de expurgo; devolve quantas linhas foram removidas.
+
+    Lixeira e usuários removidos têm cada um o seu lote por ciclo: uma
+    lixeira que nunca esvazia não adia os usuários.
+    """
+    purged = await purge_trash(
+        session,
+        settings.PURGE_BATCH_SIZE,
+        timedelta(seconds=settings.PURGE_TRASH_AFTER_SECONDS),
+    )
+
+    return purged + await purge_deleted_user(session, settings.PURGE_BATCH_SIZE)
+
+
+async def run_purge():
+    """Laço do expurgo: lote, pausa curta; sem trabalho, pausa longa."""
+    settings = get_settings()
+    session_scope = asynccontextmanager(get_session)
+
+    while True:
+        try:
+            async with session_scope() as session:
+                purged = await purge_once(session, settings)
+        except Exception:
+            # Banco indisponível etc.: tenta de novo no próximo ciclo
+            logger.exception('purge failed')
+            purged = 0
+
+        await asyncio.sleep(
+            settings.PURGE_INTERVAL_SECONDS
+            if purged
+            else settings.PURGE_IDLE_SECONDS
+        )
+
+
+async def main():
+    try:
+        await run_purge()
+    finally:
+        await dispose_engine()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
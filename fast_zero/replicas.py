@@ -0,0 +1,200 @@
+"""Roteamento das leituras para réplicas, com read-your-writes.
+
+Os GETs de listagem usam `get_read_session`: as réplicas de
+`DATABASE_REPLICA_URLS` são escolhidas em round-robin, e a que falha ao
+entregar uma conexão sai da rotação por `REPLICA_RETRY_SECONDS`. Sem réplica
+saudável, ou se o cliente escreveu nos últimos `REPLICA_STICKY_SECONDS`, a
+leitura vai ao primário.
+"""
+
+import logging
+from functools import lru_cache
+from http import HTTPStatus
+from itertools import count
+from time import monotonic
+from typing import Annotated
+
+from fastapi import Depends, Request
+from jwt.exceptions import PyJWTError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.cache import TTLCache
+from fast_zero.database import build_engine, dispose, get_session, session_scope
+from fast_zero.security import get_token_subject
+from fast_zero.settings import get_settings
+
+# Métodos que não escrevem e, portanto, não prendem o cliente ao primário
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+# Clientes lembrados ao mesmo tempo (os mais antigos saem primeiro)
+MAX_RECENT_WRITERS = 100_000
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Réplicas em round-robin, pulando as que falharam há pouco."""
+
+    def __init__(self, engines: list, retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self.down_until = [0.0] * len(engines)
+        self._next = count()
+
+    def candidates(self):
+        """Réplicas disponíveis, a partir da próxima da vez."""
+        start = next(self._next)
+        now = monotonic()
+
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+
+            if self.down_until[index] <= now:
+                yield index, self.engines[index]
+
+    def mark_down(self, index: int):
+        self.down_until[index] = monotonic() + self.retry_seconds
+        logger.warning(
+            'replica %s unavailable, retrying in %ss',
+            self.engines[index].url.render_as_string(hide_password=True),
+            self.retry_seconds,
+        )
+
+    def health(self) -> list[bool]:
+        now = monotonic()
+
+        return [down_until <= now for down_until in self.down_until]
+
+
+@lru_cache
+def get_replica_set() -> ReplicaSet | None:
+    """Engines das réplicas, criados no primeiro uso como o do primário."""
+    settings = get_settings()
+    urls = [
+        url.strip()
+        for url in settings.DATABASE_REPLICA_URLS.split(',')
+        if url.strip()
+    ]
+
+    if not urls:
+        return None
+
+    return ReplicaSet(
+        [build_engine(url) for url in urls], settings.REPLICA_RETRY_SECONDS
+    )
+
+
+async def dispose_replicas():
+    if not get_replica_set.cache_info().currsize:
+        return
+
+    replicas = get_replica_set()
+    get_replica_set.cache_clear()
+
+    if replicas is not None:
+        for engine in replicas.engines:
+            await dispose(engine)
+
+
+@lru_cache
+def get_recent_writers() -> TTLCache:
+    """Clientes que escreveram há menos de `REPLICA_STICKY_SECONDS`."""
+    return TTLCache(
+        maxsize=MAX_RECENT_WRITERS, ttl=get_settings().REPLICA_STICKY_SECONDS
+    )
+
+
+def client_key(scope) -> str:
+    """Usuário do token, quando válido; senão o endereço do cliente.
+
+    Pelo usuário, uma escrita feita com um token também vale para as
+    leituras dos outros tokens (e dispositivos) do mesmo usuário.
+    """
+    headers = dict(scope['headers'])
+    scheme, _, token = headers.get(b'authorization', b'').decode().partition(' ')
+
+    if scheme.lower() == 'bearer' and token:
+        try:
+            subject = get_token_subject(token)
+        except PyJWTError:
+            subject = None
+
+        if subject:
+            return f'user:{subject}'
+
+    client = scope.get('client')
+
+    return f'addr:{client[0] if client else None}'
+
+
+class ReadYourWritesMiddleware:
+    """Lembra quem escreveu, para `get_read_session` ler do primário.
+
+    A marca é por processo: com vários workers, o atraso das réplicas só é
+    escondido das leituras que caem no mesmo worker da escrita.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope['type'] != 'http'
+            or scope['method'] in SAFE_METHODS
+            or get_replica_set() is None
+        ):
+            return await self.app(scope, receive, send)
+
+        async def send_and_remember(message):
+            if (
+                message['type'] == 'http.response.start'
+                and message['status'] < HTTPStatus.BAD_REQUEST
+            ):
+                get_recent_writers().set(client_key(scope), True)
+
+            await send(message)
+
+        await self.app(scope, receive, send_and_remember)
+
+
+def is_replica(session) -> bool:
+    """Se a sessão lê de uma réplica, possivelmente atrasada."""
+    return session.info.get('replica', False)
+
+
+async def get_read_session(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """Sessão numa réplica saudável; na falta dela, a do primário.
+
+    A sessão do primário só abre conexão quando usada, então recebê-la como
+    dependência não custa nada nas leituras servidas pela réplica.
+    """
+    replicas = get_replica_set()
+
+    if replicas is None or get_recent_writers().get(client_key(request.scope)):
+        yield session
+        return
+
+    for index, engine in replicas.candidates():
+        async with session_scope(engine) as replica:
+            # Checagem de saúde: a conexão aberta aqui é a usada pela leitura
+            try:
+                await replica.connection()
+            except DBAPIError:
+                replicas.mark_down(index)
+                continue
+
+            replica.info['replica'] = True
+
+            try:
+                yield replica
+            except DBAPIError as error:
+                if error.connection_invalidated:
+                    replicas.mark_down(index)
+                raise
+
+            return
+
+    yield session
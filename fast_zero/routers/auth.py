@@ -4,43 +4,60 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
+from fast_zero.keys import get_key_set
 from fast_zero.models import User
 from fast_zero.schemas import Token
 from fast_zero.security import (
     create_access_token,
     get_current_user,
+    get_hashing_pool,
     verify_password,
 )
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 T_User = Annotated[User, Depends(get_current_user)]
 
 
 @router.post('/token', response_model=Token)
-def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
-    user = session.scalar(select(User).where(User.username == form_data.username))
+async def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
+    user = await session.scalar(
+        select(User).where(
+            User.username == form_data.username, User.deleted_at.is_(None)
+        )
+    )
 
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await get_hashing_pool().run(
+        verify_password, form_data.password, user.password
+    ):
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Incorrect username or password',
         )
 
-    access_token = create_access_token(data={'sub': user.username})
+    # `sub` é o id: imutável, ao contrário do username
+    access_token = create_access_token(data={'sub': str(user.id)})
 
     return {'access_token': access_token, 'token_type': 'Bearer'}
 
 
 @router.post('/refresh_token', response_model=Token)
-def refresh_access_token(
+async def refresh_access_token(
     user: T_User,
 ):
-    new_access_token = create_access_token(data={'sub': user.username})
+    new_access_token = create_access_token(data={'sub': str(user.id)})
 
     return {'access_token': new_access_token, 'token_type': 'Bearer'}
+
+
+@router.get('/jwks')
+async def read_jwks():
+    """Chaves públicas para verificar os tokens emitidos por esta API."""
+    key_set = get_key_set()
+
+    return key_set.public_jwks() if key_set else {'keys': []}
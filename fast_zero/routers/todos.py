@@ -1,87 +1,478 @@
+import csv
+import io
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import get_todo_list_cache, invalidate_todo_lists
+from fast_zero.conditional import etag_matches, make_etag
+from fast_zero.counters import summarize
 from fast_zero.database import get_session
 from fast_zero.dependencies import get_filters
-from fast_zero.models import Todo, User
+from fast_zero.events import event_stream, get_broker, publish_todo_event
+from fast_zero.models import (
+    NOT_TRASHED,
+    Todo,
+    TodoCount,
+    TodoState,
+    TodoTombstone,
+    TodoVersion,
+    User,
+)
+from fast_zero.pagination import decode_cursor, encode_cursor
+from fast_zero.replicas import get_read_session, is_replica
 from fast_zero.schemas import (
+    TODO_BATCH_LIMIT,
     Message,
+    TodoBatchCreate,
+    TodoBatchDelete,
+    TodoBatchResults,
+    TodoBatchUpdate,
+    TodoChanges,
     TodoFilters,
     TodoList,
     TodoPublic,
     TodoSchema,
+    TodoSummary,
     TodoUpdate,
 )
+from fast_zero.search import search_todos
 from fast_zero.security import get_current_user
+from fast_zero.serialization import as_dicts, dump_json
+from fast_zero.settings import get_settings
+from fast_zero.sync import (
+    after_watermark,
+    encode_watermark,
+    next_watermark,
+    parse_watermark,
+)
 
 router = APIRouter(prefix='/todos', tags=['todos'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
 T_User = Annotated[User, Depends(get_current_user)]
+T_Filters = Annotated[TodoFilters, Depends(get_filters)]
+
+# Linhas lidas do cursor do banco a cada lote na exportação
+EXPORT_BATCH_SIZE = 500
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Listagens leem só as colunas públicas em tuplas leves, sem montar
+# entidades nem registrá-las no identity map da sessão
+TODO_PUBLIC_COLUMNS = [getattr(Todo, name) for name in TodoPublic.model_fields]
+
+
+def filter_todos(query, filters: TodoFilters):
+    if filters.title:
+        query = query.where(Todo.title.contains(filters.title))
+    if filters.description:
+        query = query.where(Todo.description.contains(filters.description))
+    if filters.state:
+        query = query.where(Todo.state == filters.state)
+    else:
+        # Sem estado explícito a lixeira fica de fora, via índice parcial
+        query = query.where(NOT_TRASHED)
+
+    return query
 
 
 @router.post('/', response_model=TodoPublic, status_code=HTTPStatus.CREATED)
-def create_todo(todo: TodoSchema, session: T_Session, user: T_User):
+async def create_todo(todo: TodoSchema, session: T_Session, user: T_User):
     db_todo = Todo(user_id=user.id, **todo.model_dump())
 
     session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
+    await session.commit()
+    await invalidate_todo_lists(user.id)
+    await publish_todo_event(user.id, 'created', todos=[db_todo])
 
     return db_todo
 
 
+async def fetch_todo_page(session, user: User, filters: TodoFilters) -> dict:
+    query = filter_todos(
+        select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == user.id), filters
+    )
+
+    if filters.q:
+        # Resultados vêm por relevância, então a paginação é por offset
+        query = search_todos(query, filters.q, session.bind.dialect.name)
+        todos = await session.execute(
+            query.offset(filters.offset).limit(filters.limit)
+        )
+
+        return {'todos': as_dicts(todos), 'next_cursor': None}
+
+    if filters.after_id is not None:
+        # Keyset: custo constante independente da profundidade da página
+        query = query.where(Todo.id > filters.after_id)
+    else:
+        query = query.offset(filters.offset)
+
+    todos = await session.execute(query.order_by(Todo.id).limit(filters.limit))
+    todos = as_dicts(todos)
+
+    next_cursor = None
+
+    if len(todos) == filters.limit:
+        next_cursor = encode_cursor({'id': todos[-1]['id']})
+
+    return {'todos': todos, 'next_cursor': next_cursor}
+
+
 @router.get('/', response_model=TodoList)
-def list_todos(
+async def list_todos(
+    session: T_ReadSession,
+    user: T_User,
+    filters: T_Filters,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cache = get_todo_list_cache()
+    cache_key = None
+
+    if cache is not None:
+        cache_key, cached = await cache.lookup(user.id, filters)
+
+        if cached is not None:
+            etag, body = cached
+
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+                )
+
+            return Response(
+                body, media_type='application/json', headers={'ETag': etag}
+            )
+
+    # Versão mantida pelos triggers: uma linha por usuário, lida em O(1);
+    # se o cliente já tem essa versão, responde 304 sem buscar as linhas
+    version = await session.scalar(
+        select(TodoVersion.version).where(TodoVersion.user_id == user.id)
+    )
+    etag = make_etag(user.id, filters.model_dump(), version or 0)
+
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+        )
+
+    page = await fetch_todo_page(session, user, filters)
+
+    if cache_key is None and not get_settings().FAST_JSON_RESPONSES:
+        response.headers['ETag'] = etag
+
+        return page
+
+    body = dump_json(TodoList, page)
+
+    # Página lida de réplica pode estar atrasada: gravada no cache
+    # compartilhado, seria servida até aos clientes presos ao primário
+    if cache_key is not None and not is_replica(session):
+        await cache.store(cache_key, etag, body)
+
+    return Response(body, media_type='application/json', headers={'ETag': etag})
+
+
+@router.get('/changes', response_model=TodoChanges)
+async def list_todo_changes(
     session: T_Session,
     user: T_User,
-    filters: Annotated[TodoFilters, Depends(get_filters)],
+    cursor: Annotated[str | None, Query()] = None,
+    limit: Annotated[int, Query(gt=0, le=TODO_BATCH_LIMIT)] = 100,
 ):
-    query = select(Todo).where(Todo.user_id == user.id)
+    try:
+        watermarks = decode_cursor(cursor) if cursor else {}
+        todos_mark = parse_watermark(watermarks.get('todos'))
+        deleted_mark = parse_watermark(watermarks.get('deleted'))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+        )
 
-    if filters.title:
-        query = query.where(Todo.title.contains(filters.title))
-    if filters.description:
-        query = query.where(Todo.description.contains(filters.description))
-    if filters.state:
-        query = query.where(Todo.state == filters.state)
+    dialect = session.bind.dialect.name
+
+    # Lê só o que mudou depois das marcas, pelos índices (user_id, ts, id)
+    todos = await session.execute(
+        select(*TODO_PUBLIC_COLUMNS)
+        .where(
+            Todo.user_id == user.id,
+            after_watermark(Todo.updated_at, Todo.id, todos_mark, dialect),
+        )
+        .order_by(Todo.updated_at, Todo.id)
+        .limit(limit)
+    )
+    todos = as_dicts(todos)
+
+    deleted = await session.execute(
+        select(TodoTombstone.id, TodoTombstone.deleted_at)
+        .where(
+            TodoTombstone.user_id == user.id,
+            after_watermark(
+                TodoTombstone.deleted_at, TodoTombstone.id, deleted_mark, dialect
+            ),
+        )
+        .order_by(TodoTombstone.deleted_at, TodoTombstone.id)
+        .limit(limit)
+    )
+    deleted = as_dicts(deleted)
+
+    settle = get_settings().SYNC_SETTLE_SECONDS
+    next_cursor = encode_cursor({
+        'todos': encode_watermark(
+            next_watermark(todos, 'updated_at', todos_mark, limit, settle)
+        ),
+        'deleted': encode_watermark(
+            next_watermark(deleted, 'deleted_at', deleted_mark, limit, settle)
+        ),
+    })
+
+    return {
+        'todos': todos,
+        'deleted': [row['id'] for row in deleted],
+        'next_cursor': next_cursor,
+        'has_more': limit in {len(todos), len(deleted)},
+    }
 
-    todos = session.scalars(
-        query.offset(filters.offset).limit(filters.limit)
-    ).all()
 
-    return {'todos': todos}
+@router.get('/events', response_class=StreamingResponse)
+async def stream_todo_events(session: T_Session, user: T_User):
+    # A conexão vive por muito tempo: devolve a do banco ao pool já
+    await session.close()
+
+    broker = get_broker()
+    subscription = broker.subscribe(user.id)
+    keepalive = get_settings().EVENTS_KEEPALIVE_SECONDS
+
+    async def stream():
+        try:
+            async for chunk in event_stream(subscription, keepalive):
+                yield chunk
+        finally:
+            broker.unsubscribe(user.id, subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.get('/summary', response_model=TodoSummary)
+async def summarize_todos(session: T_Session, user: T_User):
+    # Lê os contadores mantidos pelos triggers em vez de contar os todos
+    counts = await session.execute(
+        select(TodoCount.state, TodoCount.count).where(
+            TodoCount.user_id == user.id
+        )
+    )
+    summary = summarize(counts)
+    # Como as listagens, o total não conta a lixeira
+    total = sum(
+        count
+        for state, count in summary.items()
+        if state != TodoState.trash.value
+    )
+
+    return {**summary, 'total': total}
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_todos(
+    session: T_Session,
+    user: T_User,
+    filters: T_Filters,
+    export_format: Annotated[
+        Literal['ndjson', 'csv'], Query(alias='format')
+    ] = 'ndjson',
+):
+    """Exporta todos os todos do usuário que casam com os filtros.
+
+    `offset` e `limit` são ignorados; `cursor` retoma após o último id.
+    """
+    query = filter_todos(select(Todo).where(Todo.user_id == user.id), filters)
+
+    if filters.q:
+        query = search_todos(query, filters.q, session.bind.dialect.name)
+    else:
+        if filters.after_id is not None:
+            query = query.where(Todo.id > filters.after_id)
+        query = query.order_by(Todo.id)
+
+    # Cursor no servidor: só um lote de linhas fica em memória por vez
+    result = await session.stream_scalars(
+        query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async def content():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(TodoPublic.model_fields))
+
+        if export_format == 'csv':
+            writer.writeheader()
+            yield buffer.getvalue()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+        async for todos in result.partitions():
+            for todo in todos:
+                public = TodoPublic.model_validate(todo, from_attributes=True)
+
+                if export_format == 'csv':
+                    writer.writerow(public.model_dump(mode='json'))
+                else:
+                    buffer.write(public.model_dump_json() + '\n')
+
+            yield buffer.getvalue()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename=todos.{export_format}'
+        },
+    )
+
+
+@router.post(
+    '/batch', response_model=TodoBatchResults, status_code=HTTPStatus.CREATED
+)
+async def create_todos_batch(
+    batch: TodoBatchCreate, session: T_Session, user: T_User
+):
+    # Um único INSERT com várias linhas, devolvendo as colunas geradas
+    todos = await session.scalars(
+        insert(Todo).returning(Todo, sort_by_parameter_order=True),
+        [{'user_id': user.id, **todo.model_dump()} for todo in batch.todos],
+    )
+    todos = todos.all()
+
+    await session.commit()
+    await invalidate_todo_lists(user.id)
+    await publish_todo_event(user.id, 'created', todos=todos)
+
+    return {
+        'results': [
+            {'id': todo.id, 'status': 'created', 'todo': todo} for todo in todos
+        ]
+    }
+
+
+@router.patch('/batch', response_model=TodoBatchResults)
+async def update_todos_batch(
+    batch: TodoBatchUpdate, session: T_Session, user: T_User
+):
+    ids = {item.id for item in batch.todos}
+
+    owned_ids = await session.scalars(
+        select(Todo.id).where(Todo.id.in_(ids), Todo.user_id == user.id)
+    )
+    owned_ids = set(owned_ids.all())
+
+    values = [
+        {'id': item.id, **item.model_dump(exclude={'id'}, exclude_unset=True)}
+        for item in batch.todos
+        if item.id in owned_ids
+    ]
+    values = [value for value in values if len(value) > 1]
+
+    if values:
+        # UPDATE em lote pela chave primária
+        await session.execute(update(Todo), values)
+
+    todos = await session.scalars(
+        select(Todo)
+        .where(Todo.id.in_(owned_ids))
+        .execution_options(populate_existing=True)
+    )
+    todos = {todo.id: todo for todo in todos.all()}
+
+    await session.commit()
+    await invalidate_todo_lists(user.id)
+
+    if values:
+        await publish_todo_event(user.id, 'updated', todos=todos.values())
+
+    return {
+        'results': [
+            {'id': item.id, 'status': 'updated', 'todo': todos[item.id]}
+            if item.id in todos
+            else {'id': item.id, 'status': 'not_found'}
+            for item in batch.todos
+        ]
+    }
+
+
+@router.post('/batch/delete', response_model=TodoBatchResults)
+async def delete_todos_batch(
+    batch: TodoBatchDelete, session: T_Session, user: T_User
+):
+    # Exclusão lógica: vai para a lixeira e o expurgo remove depois
+    deleted_ids = await session.scalars(
+        update(Todo)
+        .where(Todo.id.in_(batch.ids), Todo.user_id == user.id)
+        .values(state=TodoState.trash)
+        .returning(Todo.id)
+    )
+    deleted_ids = set(deleted_ids.all())
+
+    await session.commit()
+    await invalidate_todo_lists(user.id)
+
+    if deleted_ids:
+        await publish_todo_event(user.id, 'deleted', ids=sorted(deleted_ids))
+
+    return {
+        'results': [
+            {
+                'id': todo_id,
+                'status': 'deleted' if todo_id in deleted_ids else 'not_found',
+            }
+            for todo_id in batch.ids
+        ]
+    }
 
 
 @router.delete('/{todo_id}', response_model=Message)
-def delete_todo(
+async def delete_todo(
     todo_id: int,
     session: T_Session,
     user: T_User,
 ):
-    query = select(Todo).where(Todo.id == todo_id, Todo.user_id == user.id)
-
-    todo = session.scalar(query)
+    # Exclusão lógica em um único UPDATE; o expurgo remove a linha depois
+    trashed_id = await session.scalar(
+        update(Todo)
+        .where(Todo.id == todo_id, Todo.user_id == user.id)
+        .values(state=TodoState.trash)
+        .returning(Todo.id)
+    )
 
-    if not todo:
+    if trashed_id is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Task not found',
         )
 
-    session.delete(todo)
-    session.commit()
+    await session.commit()
+    await invalidate_todo_lists(user.id)
+    await publish_todo_event(user.id, 'deleted', ids=[todo_id])
 
     return {'message': 'Task has been deleted successfully'}
 
 
 @router.patch('/{todo_id}', response_model=TodoPublic)
-def update_todo(todo_id: int, session: T_Session, user: T_User, todo: TodoUpdate):
-    db_todo = session.scalar(
+async def update_todo(
+    todo_id: int, session: T_Session, user: T_User, todo: TodoUpdate
+):
+    db_todo = await session.scalar(
         select(Todo).where(Todo.id == todo_id, Todo.user_id == user.id)
     )
 
@@ -95,7 +486,8 @@ def update_todo(todo_id: int, session: T_Session, user: T_User, todo: TodoUpdate
         setattr(db_todo, key, value)
 
     session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
+    await session.commit()
+    await invalidate_todo_lists(user.id)
+    await publish_todo_event(user.id, 'updated', todos=[db_todo])
 
     return db_todo
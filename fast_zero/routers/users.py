@@ -1,20 +1,38 @@
+from datetime import UTC, datetime
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.conditional import (
+    etag_matches,
+    http_date,
+    make_etag,
+    not_modified_since,
+)
 from fast_zero.database import get_session
 from fast_zero.models import User
+from fast_zero.replicas import get_read_session
 from fast_zero.schemas import Message, UserList, UserPublic, UserSchema
-from fast_zero.security import get_current_user, get_password_hash
+from fast_zero.security import (
+    get_current_user,
+    get_hashing_pool,
+    get_password_hash,
+    get_principal_cache,
+)
+from fast_zero.serialization import as_dicts, json_response
+from fast_zero.settings import get_settings
 
 router = APIRouter(prefix='/users', tags=['users'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
 
+USER_PUBLIC_COLUMNS = [getattr(User, name) for name in UserPublic.model_fields]
+
 # Definição global para a resposta 400
 BAD_REQUEST_CREATE_USER_RESPONSE = {
     400: {
@@ -61,8 +79,18 @@ USER_NOT_ENOUGH_PERMISSION_RESPONSE = {
 
 
 @router.get('/', status_code=HTTPStatus.OK, response_model=UserList)
-def list_users(session: T_Session, limit: int = 10, skip: int = 0):
-    users = session.scalars(select(User).limit(limit).offset(skip))
+async def list_users(session: T_ReadSession, limit: int = 10, skip: int = 0):
+    # Só as colunas públicas: o hash da senha nem sai do banco
+    users = await session.execute(
+        select(*USER_PUBLIC_COLUMNS)
+        .where(User.deleted_at.is_(None))
+        .limit(limit)
+        .offset(skip)
+    )
+    users = as_dicts(users)
+
+    if get_settings().FAST_JSON_RESPONSES:
+        return json_response(UserList, {'users': users})
 
     return {'users': users}
 
@@ -73,10 +101,11 @@ def list_users(session: T_Session, limit: int = 10, skip: int = 0):
     response_model=UserPublic,
     responses={**BAD_REQUEST_CREATE_USER_RESPONSE},
 )
-def create_user(user: UserSchema, session: T_Session):
-    db_user = session.scalar(
+async def create_user(user: UserSchema, session: T_Session):
+    db_user = await session.scalar(
         select(User).where(
-            (User.email == user.email) | (User.username == user.username)
+            (User.email == user.email) | (User.username == user.username),
+            User.deleted_at.is_(None),
         )
     )
 
@@ -95,12 +124,11 @@ def create_user(user: UserSchema, session: T_Session):
     db_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await get_hashing_pool().run(get_password_hash, user.password),
     )
 
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
 
     return db_user
 
@@ -113,12 +141,33 @@ def create_user(user: UserSchema, session: T_Session):
         **USER_NOT_FOUND_RESPONSE
     },  # Resposta de erro personalizada se o usuário não for encontrado
 )
-def read_user(user_id: int, session: T_Session):
-    user = session.get(User, user_id)
-    if not user:
+async def read_user(
+    user_id: int,
+    session: T_ReadSession,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
+):
+    user = await session.get(User, user_id)
+    if not user or user.deleted_at is not None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='User not found'
         )
+
+    headers = {
+        'ETag': make_etag(user.id, user.updated_at),
+        'Last-Modified': http_date(user.updated_at),
+    }
+
+    # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+    if etag_matches(if_none_match, headers['ETag']) or (
+        not if_none_match
+        and not_modified_since(if_modified_since, user.updated_at)
+    ):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+
     return user
 
 
@@ -130,7 +179,7 @@ def read_user(user_id: int, session: T_Session):
         **USER_NOT_ENOUGH_PERMISSION_RESPONSE
     },  # Resposta de erro personalizada se o usuário não for encontrado
 )
-def update_user(
+async def update_user(
     user_id: int,
     user: UserSchema,
     session: T_Session,
@@ -144,10 +193,13 @@ def update_user(
 
     current_user.email = user.email
     current_user.username = user.username
-    current_user.password = get_password_hash(user.password)
+    current_user.password = await get_hashing_pool().run(
+        get_password_hash, user.password
+    )
 
-    session.commit()
-    session.refresh(current_user)
+    await session.commit()
+    # Só depois do commit: antes, outra requisição recolocaria a linha antiga
+    get_principal_cache().pop(current_user.id)
 
     return current_user
 
@@ -161,7 +213,7 @@ def update_user(
         **USER_NOT_ENOUGH_PERMISSION_RESPONSE
     },  # Resposta de erro personalizada se o usuário não for encontrado
 )
-def delete_user(
+async def delete_user(
     user_id: int,
     session: T_Session,
     current_user: T_CurrentUser,
@@ -172,7 +224,9 @@ def delete_user(
             detail='Not enough permission',
         )
 
-    session.delete(current_user)
-    session.commit()
+    # Exclusão lógica: o expurgo remove os todos e o usuário em lotes
+    current_user.deleted_at = datetime.now(UTC).replace(tzinfo=None)
+    await session.commit()
+    get_principal_cache().pop(current_user.id)
 
     return {'message': 'User deleted successfully'}
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 from fast_zero.models import TodoState
 
@@ -48,6 +49,10 @@ class TodoFilters(BaseModel):
     state: TodoState | None = None
     offset: int = 0
     limit: int = 10
+    # Paginação por cursor: id do último item da página anterior
+    after_id: int | None = None
+    # Busca textual ranqueada em título e descrição
+    q: str | None = None
 
 
 class TodoSchema(BaseModel):
@@ -64,9 +69,59 @@ class TodoPublic(TodoSchema):
 
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+
+
+class TodoChanges(BaseModel):
+    todos: list[TodoPublic]  # Criados ou alterados desde o cursor
+    deleted: list[int]  # Ids removidos desde o cursor
+    next_cursor: str
+    has_more: bool
+
+
+class TodoSummary(BaseModel):
+    draft: int = 0
+    todo: int = 0
+    doing: int = 0
+    done: int = 0
+    trash: int = 0
+    total: int = 0
 
 
 class TodoUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
+
+
+# Limite de itens por requisição nas rotas em lote
+TODO_BATCH_LIMIT = 500
+
+
+class TodoBatchCreate(BaseModel):
+    todos: list[TodoSchema] = Field(min_length=1, max_length=TODO_BATCH_LIMIT)
+
+
+class TodoBatchUpdateItem(TodoUpdate):
+    id: int
+
+
+class TodoBatchUpdate(BaseModel):
+    todos: list[TodoBatchUpdateItem] = Field(
+        min_length=1, max_length=TODO_BATCH_LIMIT
+    )
+
+
+class TodoBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=TODO_BATCH_LIMIT)
+
+
+# Resultado individual de cada item de uma operação em lote
+class TodoBatchResult(BaseModel):
+    id: int
+    status: Literal['created', 'updated', 'deleted', 'not_found']
+    todo: TodoPublic | None = None
+
+
+class TodoBatchResults(BaseModel):
+    results: list[TodoBatchResult]
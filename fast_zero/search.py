@@ -0,0 +1,50 @@
+import re
+
+from sqlalchemy import column, false, func, literal_column, table
+
+from fast_zero.models import Todo
+from fast_zero.triggers import SEARCH_VECTOR
+
+# Tabela FTS5 (SQLite) com conteúdo externo apontando para `todos`
+todos_fts = table(
+    'todos_fts', column('rowid'), column('rank'), column('todos_fts')
+)
+
+
+def search_todos(query, q: str, dialect: str):
+    """Filtra `query` pelos termos de `q` e ordena por relevância.
+
+    Cada termo é buscado como prefixo e todos precisam estar presentes.
+    """
+    terms = re.findall(r'\w+', q)
+
+    if not terms:
+        return query.where(false())
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+
+        return (
+            query
+            .join(todos_fts, todos_fts.c.rowid == Todo.id)
+            .where(todos_fts.c.todos_fts.op('MATCH')(match))
+            .order_by(todos_fts.c.rank)
+        )
+
+    if dialect == 'postgresql':
+        vector = literal_column(SEARCH_VECTOR)
+        tsquery = func.to_tsquery(
+            'simple', ' & '.join(f'{term}:*' for term in terms)
+        )
+
+        return query.where(vector.op('@@')(tsquery)).order_by(
+            func.ts_rank(vector, tsquery).desc()
+        )
+
+    # Demais bancos não têm índice textual: cai no LIKE
+    return query.where(
+        *(
+            Todo.title.contains(term) | Todo.description.contains(term)
+            for term in terms
+        )
+    )
@@ -1,35 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from hashlib import sha256
 from http import HTTPStatus
+from threading import Lock
+from time import time
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jwt import decode, encode
-from jwt.exceptions import ExpiredSignatureError, PyJWTError
+from jwt import decode, encode, get_unverified_header
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError, PyJWTError
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from fast_zero.cache import TTLCache
 from fast_zero.database import get_session
+from fast_zero.keys import get_key_set
 from fast_zero.models import User
-from fast_zero.settings import Settings
-
-pwd_context = PasswordHash.recommended()
+from fast_zero.settings import get_settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/auth/token')
 
-settings = Settings()
+
+@lru_cache
+def get_password_context() -> PasswordHash:
+    settings = get_settings()
+
+    return PasswordHash((
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    ))
+
+
+@lru_cache
+def get_token_cache() -> TTLCache:
+    """Digest de tokens já verificados -> (`sub`, `exp`)."""
+    return TTLCache(maxsize=get_settings().TOKEN_CACHE_SIZE, ttl=0)
+
+
+@lru_cache
+def get_principal_cache() -> TTLCache:
+    """Colunas dos usuários autenticados, indexadas pelo id (o `sub` do token).
+
+    Guarda uma cópia dos valores, não a instância: a da requisição pertence à
+    sessão dela, e o handler pode alterá-la ou o rollback pode expirá-la.
+    """
+    settings = get_settings()
+
+    return TTLCache(
+        maxsize=settings.PRINCIPAL_CACHE_SIZE,
+        ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+
+
+class HashingPool:
+    """Pool limitado para as operações de senha (argon2).
+
+    O argon2 ocupa uma thread por dezenas de milissegundos; rodando num pool
+    próprio ele não disputa o threadpool das demais rotas. Quando há
+    `max_pending` operações em andamento ou na fila, novas chamadas são
+    recusadas na hora com 503.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='password-hashing'
+        )
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = Lock()
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                    detail='Server busy, try again later',
+                    headers={'Retry-After': '1'},
+                )
+            self.pending += 1
+
+        try:
+            return await asyncio.wrap_future(self.executor.submit(func, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+
+@lru_cache
+def get_hashing_pool() -> HashingPool:
+    settings = get_settings()
+
+    return HashingPool(
+        workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    )
+
+
+def close_hashing_pool():
+    if get_hashing_pool.cache_info().currsize:
+        get_hashing_pool().executor.shutdown(wait=False)
+        get_hashing_pool.cache_clear()
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict):
+    settings = get_settings()
     to_encode = data.copy()
 
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
@@ -40,15 +131,81 @@ def create_access_token(data: dict):
     # to_encode |= {'exp': expire}
     to_encode.update({'exp': expire})
 
-    encoded_jwt = encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    key_set = get_key_set()
+
+    if key_set is None:
+        return encode(
+            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+
+    jwk = key_set.signing_key()
+
+    return encode(
+        to_encode,
+        jwk.key,
+        algorithm=jwk.algorithm_name,
+        headers={'kid': jwk.key_id},
     )
 
-    return encoded_jwt
 
+def get_token_subject(token: str) -> str | None:
+    """Valida o JWT e devolve o `sub`.
+
+    Tokens já verificados ficam no cache até expirarem, evitando refazer a
+    checagem de assinatura e das claims a cada requisição.
+    """
+    if not isinstance(token, str):
+        raise InvalidTokenError('Token must be a string')
+
+    token_cache = get_token_cache()
+    digest = sha256(token.encode()).digest()
+    cached = token_cache.get(digest)
 
-def get_current_user(
-    session: Session = Depends(get_session),
+    if cached is not None and cached[1] > time():
+        return cached[0]
+
+    settings = get_settings()
+    key_set = get_key_set()
+
+    if key_set is None:
+        key, algorithm = settings.SECRET_KEY, settings.ALGORITHM
+    else:
+        key, algorithm = key_set.verification_key(
+            get_unverified_header(token).get('kid')
+        )
+
+    payload = decode(token, key, algorithms=[algorithm])
+
+    subject = payload.get('sub')
+    expires_at = payload.get('exp')
+
+    if subject and expires_at:
+        token_cache.set(digest, (subject, expires_at), ttl=expires_at - time())
+
+    return subject
+
+
+def user_values(user: User) -> dict:
+    return {
+        column.key: getattr(user, column.key)
+        for column in User.__mapper__.column_attrs
+    }
+
+
+def detached_user(values: dict) -> User:
+    """Usuário fora de qualquer sessão, como se tivesse sido carregado."""
+    user = User.__mapper__.class_manager.new_instance()
+
+    for key, value in values.items():
+        setattr(user, key, value)
+
+    make_transient_to_detached(user)
+
+    return user
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
 ):
     credentials_exception = HTTPException(
@@ -58,24 +215,33 @@ def get_current_user(
     )
 
     try:
-        payload = decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        subject = get_token_subject(token)
 
-        username: str = payload.get('sub')
-
-        if not username:
+        if not subject:
             raise credentials_exception
 
+        user_id = int(subject)
+
     except ExpiredSignatureError:
         raise credentials_exception
 
-    except PyJWTError:
+    except (PyJWTError, ValueError):
         raise credentials_exception
 
-    user = session.scalar(select(User).where(User.username == username))
+    principal_cache = get_principal_cache()
+    cached_values = principal_cache.get(user_id)
+
+    if cached_values is not None:
+        # Anexa uma cópia do usuário à sessão atual sem consultar o banco
+        return await session.merge(detached_user(cached_values), load=False)
+
+    user = await session.scalar(
+        select(User).where(User.id == user_id, User.deleted_at.is_(None))
+    )
 
     if user is None:
         raise credentials_exception
 
+    principal_cache.set(user_id, user_values(user))
+
     return user
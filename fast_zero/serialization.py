@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def as_dicts(result) -> list[dict]:
+    """Converte o resultado de uma projeção de colunas em dicts simples.
+
+    Validar dicts é bem mais barato que ler `Row` por atributo.
+    """
+    keys = list(result.keys())
+
+    return [dict(zip(keys, row)) for row in result]
+
+
+@lru_cache
+def get_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    """Compila o validador/serializador do schema uma única vez."""
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: type[BaseModel], data) -> bytes:
+    """Valida `data` (objetos ORM ou dicts) e gera os bytes JSON no pydantic-core.
+
+    Evita o caminho padrão do FastAPI, que valida pelo `response_model`,
+    converte para dict com `jsonable_encoder` e só então chama o `json.dumps`.
+    """
+    adapter = get_adapter(schema)
+
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(
+    schema: type[BaseModel], data, headers: dict | None = None
+) -> Response:
+    return Response(
+        dump_json(schema, data), media_type='application/json', headers=headers
+    )
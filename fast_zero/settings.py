@@ -1,5 +1,8 @@
 import os
+from functools import lru_cache
+from typing import Literal
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,6 +14,85 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
-    SECRET_KEY: str
-    ALGORITHM: str
+    # Usa AsyncSession (True) ou a Session síncrona no threadpool (False)
+    DATABASE_ASYNC: bool = True
+    # Pool de conexões (ignorado para SQLite em memória)
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 5
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    # Tempo máximo por statement, em ms (apenas PostgreSQL)
+    DATABASE_STATEMENT_TIMEOUT_MS: int | None = None
+    # Réplicas de leitura (URLs separadas por vírgula) usadas pelos GETs de
+    # listagem; vazio lê tudo do primário
+    DATABASE_REPLICA_URLS: str = ''
+    # Após uma escrita, as leituras do mesmo cliente vão ao primário por
+    # este tempo (deve cobrir o atraso de replicação)
+    REPLICA_STICKY_SECONDS: float = 5
+    # Réplica que falhou fica fora da rotação por este tempo
+    REPLICA_RETRY_SECONDS: float = 30
+    # Assinatura HMAC (padrão); dispensável quando JWT_KEYS_FILE é usado
+    SECRET_KEY: str | None = None
+    ALGORITHM: str = 'HS256'
+    # Conjunto de chaves RS256/EdDSA em formato JWKS, com rotação por `kid`
+    JWT_KEYS_FILE: str | None = None
+    JWT_SIGNING_KID: str | None = None
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Custo do argon2 e pool dedicado para hash/verificação de senhas
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # Cache de tokens já verificados (0 desabilita)
+    TOKEN_CACHE_SIZE: int = 10_000
+    # Cache de usuários autenticados (0 desabilita)
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    # Cache das páginas de `GET /api/todos`. O backend em memória é por
+    # processo; com vários workers use o Redis para invalidar em todos
+    RESPONSE_CACHE_BACKEND: Literal['none', 'memory', 'redis'] = 'none'
+    RESPONSE_CACHE_URL: str = 'redis://localhost:6379/0'
+    RESPONSE_CACHE_SIZE: int = 10_000
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    # Serializa as listagens direto para bytes JSON, validando uma só vez
+    FAST_JSON_RESPONSES: bool = False
+    # Latência/queries por rota, header Server-Timing e `GET /metrics`
+    METRICS_ENABLED: bool = False
+    # Loga SQL, tipos dos parâmetros e rota das queries acima do limite
+    SLOW_QUERY_THRESHOLD_MS: float | None = None
+    # Perfila 1 a cada N requisições (0 desliga) e grava as pilhas, no
+    # formato do flamegraph, das que passarem do orçamento
+    PROFILE_SAMPLE_RATE: int = 0
+    PROFILE_BUDGET_MS: float = 200
+    PROFILE_INTERVAL_MS: float = 5
+    PROFILE_OUTPUT_DIR: str = 'profiles'
+    # Janela reenviada no fim da sincronização incremental: cobre timestamps
+    # de resolução de segundos e transações que commitam fora de ordem
+    SYNC_SETTLE_SECONDS: int = 5
+    # Push de eventos (SSE). Com vários workers use o Redis para que todos
+    # recebam os eventos publicados em qualquer um deles
+    EVENTS_BROKER: Literal['memory', 'redis'] = 'memory'
+    EVENTS_BROKER_URL: str = 'redis://localhost:6379/0'
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_KEEPALIVE_SECONDS: float = 15
+    # Expurgo em segundo plano da lixeira e dos usuários removidos. Com
+    # vários workers, prefira desligar aqui e rodar `python -m fast_zero.purge`
+    PURGE_ENABLED: bool = True
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_INTERVAL_SECONDS: float = 1
+    PURGE_IDLE_SECONDS: float = 60
+    PURGE_TRASH_AFTER_SECONDS: int = 7 * 24 * 60 * 60
+
+    @model_validator(mode='after')
+    def check_jwt_keys(self):
+        if not self.SECRET_KEY and not self.JWT_KEYS_FILE:
+            raise ValueError('Either SECRET_KEY or JWT_KEYS_FILE must be set')
+        return self
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Lê o ambiente/.env uma única vez, no primeiro uso."""
+    return Settings()
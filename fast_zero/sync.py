@@ -0,0 +1,59 @@
+"""Sincronização incremental de todos a partir de uma marca d'água.
+
+Remoções são registradas em `todo_tombstones` por trigger (em `triggers`),
+inclusive as feitas em lote. Alterações e remoções são lidas em duas
+sequências com keyset por (timestamp, id), cada uma com sua marca no cursor.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import DateTime, func, literal, true, tuple_
+
+
+def parse_watermark(value) -> tuple[datetime, int] | None:
+    """Lê uma marca `[timestamp ISO, id]` do cursor; levanta ValueError."""
+    if value is None:
+        return None
+
+    timestamp, row_id = value
+
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def after_watermark(timestamp, row_id, watermark, dialect: str):
+    """Filtro keyset `(timestamp, id) > marca`, coberto pelo índice."""
+    if watermark is None:
+        return true()
+
+    value = literal(watermark[0], DateTime)
+
+    if dialect == 'sqlite':
+        # CURRENT_TIMESTAMP grava sem fração; o bind teria ".000000"
+        value = func.datetime(value)
+
+    return tuple_(timestamp, row_id) > tuple_(value, watermark[1])
+
+
+def next_watermark(rows, key: str, watermark, limit: int, settle: int):
+    """Marca para a próxima chamada a partir da última linha lida.
+
+    Com a página cheia, continua exatamente dali. No fim da sequência, volta
+    para `agora - settle` se a última linha for mais recente: o que mudou
+    nessa janela é reenviado (clientes aplicam como upsert), mas nada que
+    commitou atrasado ou caiu no mesmo segundo fica para trás.
+    """
+    last = (rows[-1][key], rows[-1]['id']) if rows else watermark
+
+    if last is None or len(rows) == limit:
+        return last
+
+    settled = datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=settle)
+
+    return min(last, (settled, 0))
+
+
+def encode_watermark(watermark) -> list | None:
+    if watermark is None:
+        return None
+
+    return [watermark[0].isoformat(), watermark[1]]
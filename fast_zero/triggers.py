@@ -0,0 +1,227 @@
+"""Triggers e objetos auxiliares de `todos`, criados junto com a tabela.
+
+`models` registra estes DDLs em `todos`, então qualquer `create_all` sobre o
+metadata cria os triggers, seja qual for o módulo importado. Nos bancos
+gerenciados por migração, elas criam os mesmos objetos.
+
+- contadores por estado e versão por usuário: usados por `counters`;
+- tombstones das remoções: usados por `sync`;
+- índice textual (FTS5 no SQLite, GIN no PostgreSQL): usado por `search`.
+"""
+
+from sqlalchemy import DDL, Table, event
+
+# Expressão indexada no PostgreSQL; a consulta precisa usar a mesma
+SEARCH_VECTOR = "to_tsvector('simple', title || ' ' || description)"
+
+# Contadores por estado e versão dos todos de cada usuário
+COUNTERS_SQLITE_DDL = (
+    """
+    CREATE TRIGGER todo_counts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todo_counts (user_id, state, count)
+        VALUES (new.user_id, new.state, 1)
+        ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_counts_ad AFTER DELETE ON todos BEGIN
+        UPDATE todo_counts SET count = count - 1
+        WHERE user_id = old.user_id AND state = old.state;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_counts_au AFTER UPDATE OF state, user_id ON todos
+    WHEN old.state IS NOT new.state OR old.user_id IS NOT new.user_id
+    BEGIN
+        UPDATE todo_counts SET count = count - 1
+        WHERE user_id = old.user_id AND state = old.state;
+        INSERT INTO todo_counts (user_id, state, count)
+        VALUES (new.user_id, new.state, 1)
+        ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_versions_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todo_versions (user_id, version) VALUES (new.user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_versions_ad AFTER DELETE ON todos BEGIN
+        UPDATE todo_versions SET version = version + 1
+        WHERE user_id = old.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_versions_au AFTER UPDATE ON todos BEGIN
+        UPDATE todo_versions SET version = version + 1
+        WHERE user_id = old.user_id AND old.user_id IS NOT new.user_id;
+        INSERT INTO todo_versions (user_id, version) VALUES (new.user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+)
+
+COUNTERS_POSTGRESQL_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION todo_counts_update() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE todo_counts SET count = count - 1
+            WHERE user_id = OLD.user_id AND state = OLD.state;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO todo_counts (user_id, state, count)
+            VALUES (NEW.user_id, NEW.state, 1)
+            ON CONFLICT (user_id, state)
+            DO UPDATE SET count = todo_counts.count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todo_counts_insert_delete AFTER INSERT OR DELETE ON todos
+    FOR EACH ROW EXECUTE FUNCTION todo_counts_update()
+    """,
+    """
+    CREATE TRIGGER todo_counts_update AFTER UPDATE OF state, user_id ON todos
+    FOR EACH ROW
+    WHEN (
+        OLD.state IS DISTINCT FROM NEW.state
+        OR OLD.user_id IS DISTINCT FROM NEW.user_id
+    )
+    EXECUTE FUNCTION todo_counts_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION todo_versions_update() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' OR (
+            TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id
+        ) THEN
+            UPDATE todo_versions SET version = version + 1
+            WHERE user_id = OLD.user_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO todo_versions (user_id, version)
+            VALUES (NEW.user_id, 1)
+            ON CONFLICT (user_id)
+            DO UPDATE SET version = todo_versions.version + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todo_versions_update
+    AFTER INSERT OR UPDATE OR DELETE ON todos
+    FOR EACH ROW EXECUTE FUNCTION todo_versions_update()
+    """,
+)
+# Remoções, para a sincronização incremental
+TOMBSTONES_SQLITE_DDL = (
+    """
+    CREATE TRIGGER todo_tombstones_ad AFTER DELETE ON todos BEGIN
+        INSERT OR REPLACE INTO todo_tombstones (id, user_id, deleted_at)
+        VALUES (old.id, old.user_id, CURRENT_TIMESTAMP);
+    END
+    """,
+    # O SQLite pode reutilizar o maior id removido
+    """
+    CREATE TRIGGER todo_tombstones_ai AFTER INSERT ON todos BEGIN
+        DELETE FROM todo_tombstones WHERE id = new.id;
+    END
+    """,
+)
+
+TOMBSTONES_POSTGRESQL_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION todo_tombstones_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO todo_tombstones (id, user_id, deleted_at)
+        VALUES (OLD.id, OLD.user_id, now())
+        ON CONFLICT (id) DO UPDATE
+        SET user_id = EXCLUDED.user_id, deleted_at = EXCLUDED.deleted_at;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todo_tombstones_delete AFTER DELETE ON todos
+    FOR EACH ROW EXECUTE FUNCTION todo_tombstones_insert()
+    """,
+)
+# Tabela FTS5 (SQLite) com conteúdo externo apontando para `todos`
+SEARCH_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description ON todos
+    BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+)
+
+# Funções do PostgreSQL usadas pelos triggers, removidas junto com `todos`
+POSTGRESQL_FUNCTIONS = (
+    'todo_counts_update',
+    'todo_versions_update',
+    'todo_tombstones_insert',
+)
+
+
+def register_triggers(todos: Table):
+    for dialect, statements in (
+        ('sqlite', COUNTERS_SQLITE_DDL),
+        ('postgresql', COUNTERS_POSTGRESQL_DDL),
+        ('sqlite', TOMBSTONES_SQLITE_DDL),
+        ('postgresql', TOMBSTONES_POSTGRESQL_DDL),
+        ('sqlite', SEARCH_SQLITE_DDL),
+        (
+            'postgresql',
+            (
+                'CREATE INDEX ix_todos_search ON todos '
+                f'USING gin ({SEARCH_VECTOR})',
+            ),
+        ),
+    ):
+        for statement in statements:
+            event.listen(
+                todos,
+                'after_create',
+                DDL(statement).execute_if(dialect=dialect),
+            )
+
+    event.listen(
+        todos,
+        'before_drop',
+        DDL('DROP TABLE IF EXISTS todos_fts').execute_if(dialect='sqlite'),
+    )
+
+    for function in POSTGRESQL_FUNCTIONS:
+        event.listen(
+            todos,
+            'after_drop',
+            DDL(f'DROP FUNCTION IF EXISTS {function}()').execute_if(
+                dialect='postgresql'
+            ),
+        )
@@ -0,0 +1,70 @@
+"""Cria busca textual em todos
+
+Revision ID: a4f2c8e61d07
+Revises: 5c1e9a7d2b43
+Create Date: 2026-10-18 11:03:47.208153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f2c8e61d07'
+down_revision: Union[str, None] = '5c1e9a7d2b43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = "to_tsvector('simple', title || ' ' || description)"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE todos_fts USING fts5(
+                title, description, content='todos', content_rowid='id'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+                INSERT INTO todos_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+                INSERT INTO todos_fts(todos_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description
+            ON todos BEGIN
+                INSERT INTO todos_fts(todos_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO todos_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        # Indexa os todos já existentes
+        op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            f'CREATE INDEX ix_todos_search ON todos USING gin ({SEARCH_VECTOR})'
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER todos_fts_au')
+        op.execute('DROP TRIGGER todos_fts_ad')
+        op.execute('DROP TRIGGER todos_fts_ai')
+        op.execute('DROP TABLE todos_fts')
+    elif dialect == 'postgresql':
+        op.drop_index('ix_todos_search', table_name='todos')
@@ -0,0 +1,99 @@
+"""Cria versão dos todos por usuário
+
+Revision ID: b6e2d8a4c1f9
+Revises: f1c7a2e9d4b6
+Create Date: 2026-10-18 18:42:13.208561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d8a4c1f9'
+down_revision: Union[str, None] = 'f1c7a2e9d4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('todo_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE TRIGGER todo_versions_ai AFTER INSERT ON todos BEGIN
+                INSERT INTO todo_versions (user_id, version)
+                VALUES (new.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_versions_ad AFTER DELETE ON todos BEGIN
+                UPDATE todo_versions SET version = version + 1
+                WHERE user_id = old.user_id;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_versions_au AFTER UPDATE ON todos BEGIN
+                UPDATE todo_versions SET version = version + 1
+                WHERE user_id = old.user_id AND old.user_id IS NOT new.user_id;
+                INSERT INTO todo_versions (user_id, version)
+                VALUES (new.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+            END
+        """)
+    elif dialect == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION todo_versions_update()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' OR (
+                    TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id
+                ) THEN
+                    UPDATE todo_versions SET version = version + 1
+                    WHERE user_id = OLD.user_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO todo_versions (user_id, version)
+                    VALUES (NEW.user_id, 1)
+                    ON CONFLICT (user_id)
+                    DO UPDATE SET version = todo_versions.version + 1;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_versions_update
+            AFTER INSERT OR UPDATE OR DELETE ON todos
+            FOR EACH ROW EXECUTE FUNCTION todo_versions_update()
+        """)
+
+    # Usuários que já têm todos começam na versão 1
+    op.execute("""
+        INSERT INTO todo_versions (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM todos
+    """)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER todo_versions_au')
+        op.execute('DROP TRIGGER todo_versions_ad')
+        op.execute('DROP TRIGGER todo_versions_ai')
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER todo_versions_update ON todos')
+        op.execute('DROP FUNCTION todo_versions_update()')
+
+    op.drop_table('todo_versions')
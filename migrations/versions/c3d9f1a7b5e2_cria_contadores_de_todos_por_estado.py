@@ -0,0 +1,112 @@
+"""Cria contadores de todos por estado
+
+Revision ID: c3d9f1a7b5e2
+Revises: a4f2c8e61d07
+Create Date: 2026-10-18 14:21:09.512307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9f1a7b5e2'
+down_revision: Union[str, None] = 'a4f2c8e61d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('todo_counts',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('state', postgresql.ENUM('draft', 'todo', 'doing', 'done', 'trash', name='todostate', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'state')
+    )
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE TRIGGER todo_counts_ai AFTER INSERT ON todos BEGIN
+                INSERT INTO todo_counts (user_id, state, count)
+                VALUES (new.user_id, new.state, 1)
+                ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_counts_ad AFTER DELETE ON todos BEGIN
+                UPDATE todo_counts SET count = count - 1
+                WHERE user_id = old.user_id AND state = old.state;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_counts_au AFTER UPDATE OF state, user_id
+            ON todos
+            WHEN old.state IS NOT new.state OR old.user_id IS NOT new.user_id
+            BEGIN
+                UPDATE todo_counts SET count = count - 1
+                WHERE user_id = old.user_id AND state = old.state;
+                INSERT INTO todo_counts (user_id, state, count)
+                VALUES (new.user_id, new.state, 1)
+                ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+            END
+        """)
+    elif dialect == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION todo_counts_update() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    UPDATE todo_counts SET count = count - 1
+                    WHERE user_id = OLD.user_id AND state = OLD.state;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO todo_counts (user_id, state, count)
+                    VALUES (NEW.user_id, NEW.state, 1)
+                    ON CONFLICT (user_id, state)
+                    DO UPDATE SET count = todo_counts.count + 1;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_counts_insert_delete
+            AFTER INSERT OR DELETE ON todos
+            FOR EACH ROW EXECUTE FUNCTION todo_counts_update()
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_counts_update
+            AFTER UPDATE OF state, user_id ON todos
+            FOR EACH ROW
+            WHEN (
+                OLD.state IS DISTINCT FROM NEW.state
+                OR OLD.user_id IS DISTINCT FROM NEW.user_id
+            )
+            EXECUTE FUNCTION todo_counts_update()
+        """)
+
+    # Conta os todos já existentes
+    op.execute("""
+        INSERT INTO todo_counts (user_id, state, count)
+        SELECT user_id, state, count(*) FROM todos GROUP BY user_id, state
+    """)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER todo_counts_au')
+        op.execute('DROP TRIGGER todo_counts_ad')
+        op.execute('DROP TRIGGER todo_counts_ai')
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER todo_counts_update ON todos')
+        op.execute('DROP TRIGGER todo_counts_insert_delete ON todos')
+        op.execute('DROP FUNCTION todo_counts_update()')
+
+    op.drop_table('todo_counts')
@@ -0,0 +1,57 @@
+"""Libera nome e e-mail de usuários removidos
+
+Revision ID: d4a8e2b7c9f1
+Revises: b6e2d8a4c1f9
+Create Date: 2026-10-18 20:14:36.871254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8e2b7c9f1'
+down_revision: Union[str, None] = 'b6e2d8a4c1f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# No SQLite as restrições de `users` não têm nome: a convenção as nomeia para
+# o batch, que recria a tabela
+SQLITE_NAMING_CONVENTION = {'uq': 'uq_%(table_name)s_%(column_0_name)s'}
+
+
+def unique_constraint_names(dialect: str) -> tuple[str, str]:
+    if dialect == 'sqlite':
+        return 'uq_users_username', 'uq_users_email'
+
+    # Nomes padrão do PostgreSQL
+    return 'users_username_key', 'users_email_key'
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    with op.batch_alter_table(
+        'users', naming_convention=SQLITE_NAMING_CONVENTION
+    ) as batch_op:
+        for name in unique_constraint_names(dialect):
+            batch_op.drop_constraint(name, type_='unique')
+
+    op.create_index('ix_users_username_active', 'users', ['username'], unique=True, sqlite_where=sa.text('deleted_at IS NULL'), postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_users_email_active', 'users', ['email'], unique=True, sqlite_where=sa.text('deleted_at IS NULL'), postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    op.drop_index('ix_users_email_active', table_name='users')
+    op.drop_index('ix_users_username_active', table_name='users')
+
+    with op.batch_alter_table(
+        'users', naming_convention=SQLITE_NAMING_CONVENTION
+    ) as batch_op:
+        username, email = unique_constraint_names(dialect)
+        batch_op.create_unique_constraint(username, ['username'])
+        batch_op.create_unique_constraint(email, ['email'])
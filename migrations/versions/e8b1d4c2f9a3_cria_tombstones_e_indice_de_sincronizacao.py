@@ -0,0 +1,77 @@
+"""Cria tombstones e índice de sincronização de todos
+
+Revision ID: e8b1d4c2f9a3
+Revises: c3d9f1a7b5e2
+Create Date: 2026-10-18 15:02:41.873215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b1d4c2f9a3'
+down_revision: Union[str, None] = 'c3d9f1a7b5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('todo_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_todo_tombstones_user_id_deleted_at_id', 'todo_tombstones', ['user_id', 'deleted_at', 'id'], unique=False)
+    op.create_index('ix_todos_user_id_updated_at_id', 'todos', ['user_id', 'updated_at', 'id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE TRIGGER todo_tombstones_ad AFTER DELETE ON todos BEGIN
+                INSERT OR REPLACE INTO todo_tombstones (id, user_id, deleted_at)
+                VALUES (old.id, old.user_id, CURRENT_TIMESTAMP);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_tombstones_ai AFTER INSERT ON todos BEGIN
+                DELETE FROM todo_tombstones WHERE id = new.id;
+            END
+        """)
+    elif dialect == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION todo_tombstones_insert()
+            RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO todo_tombstones (id, user_id, deleted_at)
+                VALUES (OLD.id, OLD.user_id, now())
+                ON CONFLICT (id) DO UPDATE
+                SET user_id = EXCLUDED.user_id, deleted_at = EXCLUDED.deleted_at;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER todo_tombstones_delete AFTER DELETE ON todos
+            FOR EACH ROW EXECUTE FUNCTION todo_tombstones_insert()
+        """)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER todo_tombstones_ai')
+        op.execute('DROP TRIGGER todo_tombstones_ad')
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER todo_tombstones_delete ON todos')
+        op.execute('DROP FUNCTION todo_tombstones_insert()')
+
+    op.drop_index('ix_todos_user_id_updated_at_id', table_name='todos')
+    op.drop_index('ix_todo_tombstones_user_id_deleted_at_id', table_name='todo_tombstones')
+    op.drop_table('todo_tombstones')
@@ -0,0 +1,30 @@
+"""Adiciona exclusão lógica de usuários e índices parciais da lixeira
+
+Revision ID: f1c7a2e9d4b6
+Revises: e8b1d4c2f9a3
+Create Date: 2026-10-18 16:21:07.514392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a2e9d4b6'
+down_revision: Union[str, None] = 'e8b1d4c2f9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_todos_user_id_id_live', 'todos', ['user_id', 'id'], unique=False, sqlite_where=sa.text("state != 'trash'"), postgresql_where=sa.text("state != 'trash'"))
+    op.create_index('ix_todos_trash_updated_at', 'todos', ['updated_at'], unique=False, sqlite_where=sa.text("state = 'trash'"), postgresql_where=sa.text("state = 'trash'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_trash_updated_at', table_name='todos')
+    op.drop_index('ix_todos_user_id_id_live', table_name='todos')
+    op.drop_column('users', 'deleted_at')
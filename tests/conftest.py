@@ -1,18 +1,35 @@
+import asyncio
 from contextlib import contextmanager
 from datetime import datetime
+from fnmatch import fnmatch
 
 import factory
 import factory.fuzzy
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from fast_zero.app import app
-from fast_zero.database import get_session
+from fast_zero.cache import MemoryBackend, TodoListCache
+from fast_zero.database import SyncSession, get_session
+from fast_zero.events import LocalBroker
 from fast_zero.models import Todo, TodoState, User, table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.replicas import (
+    dispose_replicas,
+    get_recent_writers,
+    get_replica_set,
+)
+from fast_zero.security import (
+    get_password_hash,
+    get_principal_cache,
+    get_token_cache,
+)
+from fast_zero.settings import get_settings
 
 
 class UserFactory(factory.Factory):
@@ -30,20 +47,153 @@ class TodoFactory(factory.Factory):
 
     title = factory.Faker('sentence')
     description = factory.Faker('text')
-    state = factory.fuzzy.FuzzyChoice(TodoState)
+    # Todos na lixeira não aparecem nas listagens; só quando pedidos
+    state = factory.fuzzy.FuzzyChoice([
+        state for state in TodoState if state != TodoState.trash
+    ])
     user_id = 1
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+
+    get_principal_cache().clear()
+    get_token_cache().clear()
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.patterns = []
+        self.messages = asyncio.Queue()
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+        self.redis.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+
+class FakeRedis:
+    """Substituto local de um cliente Redis assíncrono (get/set e pub/sub)."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+
+    async def publish(self, channel, data):
+        for pubsub in self.subscribers:
+            for pattern in pubsub.patterns:
+                if fnmatch(channel, pattern):
+                    pubsub.messages.put_nowait({
+                        'type': 'pmessage',
+                        'pattern': pattern.encode(),
+                        'channel': channel.encode(),
+                        'data': data.encode(),
+                    })
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+
+        self.data[key] = value
+
+        return True
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def todo_list_cache(request, monkeypatch):
+    backend = (
+        MemoryBackend(maxsize=100) if request.param == 'memory' else FakeRedis()
+    )
+    cache = TodoListCache(backend, ttl=60)
+
+    monkeypatch.setattr('fast_zero.cache.get_todo_list_cache', lambda: cache)
+    monkeypatch.setattr(
+        'fast_zero.routers.todos.get_todo_list_cache', lambda: cache
+    )
+
+    return cache
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = LocalBroker(queue_size=10)
+    monkeypatch.setattr('fast_zero.events.get_broker', lambda: broker)
+    monkeypatch.setattr('fast_zero.routers.todos.get_broker', lambda: broker)
+
+    return broker
+
+
+@pytest.fixture
+def replica_urls(tmp_path, monkeypatch):
+    """Duas réplicas em arquivos SQLite, com o schema e sem dados."""
+    urls = [f'sqlite:///{tmp_path}/replica{number}.db' for number in range(2)]
+
+    for url in urls:
+        engine = create_engine(url)
+        table_registry.metadata.create_all(engine)
+        engine.dispose()
+
+    # Sessões síncronas, como as do primário no `client`
+    monkeypatch.setattr(get_settings(), 'DATABASE_ASYNC', False)
+    monkeypatch.setattr(get_settings(), 'DATABASE_REPLICA_URLS', ','.join(urls))
+    get_replica_set.cache_clear()
+    get_recent_writers.cache_clear()
+
+    yield urls
+
+    asyncio.run(dispose_replicas())
+    get_recent_writers.cache_clear()
+
+
 @pytest.fixture
-def client(session):
-    def get_session_override():
-        return session
+def fast_json(monkeypatch):
+    monkeypatch.setattr(get_settings(), 'FAST_JSON_RESPONSES', True)
+
+
+@pytest.fixture(params=['sync', 'async'])
+def client(request, session):
+    """Cliente do app sobre o banco do `session`, nos dois tipos de sessão.
+
+    `sync` usa a própria sessão do teste (via `SyncSession`); `async` abre
+    uma `AsyncSession` por requisição, como `get_session` em produção.
+    """
+    engine = None
+
+    if request.param == 'sync':
+
+        def get_session_override():
+            return SyncSession(session)
+
+    else:
+        engine = create_async_engine(
+            session.bind.url.set(drivername='sqlite+aiosqlite')
+        )
+
+        async def get_session_override():
+            async with AsyncSession(
+                engine, expire_on_commit=False
+            ) as request_session:
+                yield request_session
 
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
 
         yield client
 
+        if engine is not None:
+            client.portal.call(engine.dispose)
+
     app.dependency_overrides.clear()
 
 
@@ -57,18 +207,57 @@ def user_data():
 
 
 @pytest.fixture
-def session():
+def session(tmp_path):
+    # Em arquivo, para o `client` assíncrono abrir outras conexões nele
     engine = create_engine(
-        'sqlite:///:memory:',
+        f'sqlite:///{tmp_path}/test.db',
         connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
     )
     table_registry.metadata.create_all(engine)
 
-    with Session(engine) as session:
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
     table_registry.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_session():
+    engine = create_async_engine(
+        'sqlite+aiosqlite:///:memory:',
+        poolclass=StaticPool,
+    )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_client(async_session):
+    # Uma sessão por requisição, como em `get_session`
+    async def get_session_override():
+        async with AsyncSession(
+            async_session.bind, expire_on_commit=False
+        ) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        yield client
+
+    app.dependency_overrides.clear()
 
 
 @contextmanager
@@ -1,6 +1,14 @@
+import csv
+import io
+import json
 from http import HTTPStatus
 
-from fast_zero.models import TodoState
+import pytest
+from sqlalchemy import delete, func, update
+
+from fast_zero.models import Todo, TodoState
+from fast_zero.pagination import encode_cursor
+from fast_zero.settings import get_settings
 from tests.conftest import TodoFactory
 
 
@@ -243,3 +251,597 @@ def test_patch_todo_error(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Task not found'}
+
+
+def test_list_todos_cursor_pagination_should_walk_all_todos(
+    session, client, register_user, token
+):
+    expected_ids = list(range(1, 6))
+
+    session.bulk_save_objects(
+        TodoFactory.create_batch(5, user_id=register_user.id)
+    )
+
+    session.commit()
+
+    ids = []
+    url = '/api/todos?limit=2'
+
+    while url:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == HTTPStatus.OK
+
+        data = response.json()
+        ids += [todo['id'] for todo in data['todos']]
+        url = data['next_cursor'] and (
+            f'/api/todos?limit=2&cursor={data["next_cursor"]}'
+        )
+
+    assert ids == expected_ids
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/api/todos?cursor=not-a-cursor',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_list_todos_search_should_rank_matches(
+    session, client, register_user, token
+):
+    session.add_all([
+        TodoFactory(user_id=register_user.id, title='Buy milk', description='x'),
+        TodoFactory(
+            user_id=register_user.id,
+            title='Groceries',
+            description='milk and bread, more milk',
+        ),
+        TodoFactory(user_id=register_user.id, title='Other', description='y'),
+    ])
+    session.commit()
+
+    response = client.get(
+        '/api/todos?q=mil',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'Groceries',
+        'Buy milk',
+    ]
+
+
+def test_list_todos_search_should_follow_updates(
+    session, client, register_user, token
+):
+    todo = TodoFactory(
+        user_id=register_user.id, title='Old title', description='x'
+    )
+    session.add(todo)
+    session.commit()
+
+    client.patch(
+        f'/api/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'Brand new title'},
+    )
+
+    old = client.get(
+        '/api/todos?q=old', headers={'Authorization': f'Bearer {token}'}
+    )
+    new = client.get(
+        '/api/todos?q=brand', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert old.json()['todos'] == []
+    assert [todo['id'] for todo in new.json()['todos']] == [todo.id]
+
+
+def test_list_todos_search_without_terms_should_return_nothing(client, token):
+    response = client.get(
+        '/api/todos?q=%25%25', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'todos': [], 'next_cursor': None}
+
+
+def test_create_todos_batch(client, token):
+    response = client.post(
+        '/api/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'title': 'First', 'description': 'a', 'state': 'draft'},
+                {'title': 'Second', 'description': 'b', 'state': 'todo'},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+    results = response.json()['results']
+
+    assert [result['status'] for result in results] == ['created', 'created']
+    assert [result['todo']['title'] for result in results] == [
+        'First',
+        'Second',
+    ]
+    assert all(result['todo']['created_at'] for result in results)
+
+
+def test_update_todos_batch(
+    session, client, register_user, register_other_user, token
+):
+    mine = TodoFactory(user_id=register_user.id, state=TodoState.draft)
+    other = TodoFactory(user_id=register_other_user.id)
+    session.add_all([mine, other])
+    session.commit()
+
+    response = client.patch(
+        '/api/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'id': mine.id, 'state': 'done'},
+                {'id': other.id, 'state': 'done'},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    results = response.json()['results']
+
+    assert results[0]['status'] == 'updated'
+    assert results[0]['todo']['state'] == TodoState.done.value
+    assert results[0]['todo']['title'] == mine.title
+    assert results[1] == {'id': other.id, 'status': 'not_found', 'todo': None}
+
+
+def test_delete_todos_batch(session, client, register_user, token):
+    todo = TodoFactory(user_id=register_user.id)
+    session.add(todo)
+    session.commit()
+
+    response = client.post(
+        '/api/todos/batch/delete',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': [todo.id, 999]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'results': [
+            {'id': todo.id, 'status': 'deleted', 'todo': None},
+            {'id': 999, 'status': 'not_found', 'todo': None},
+        ]
+    }
+
+
+def test_create_todos_batch_empty_should_fail(client, token):
+    response = client.post(
+        '/api/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'todos': []},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_export_todos_ndjson(session, client, register_user, token):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(3, user_id=register_user.id, state='todo')
+    )
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=register_user.id, state='done')
+    )
+    session.commit()
+
+    response = client.get(
+        '/api/todos/export?state=todo',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [line['id'] for line in lines] == [1, 2, 3]
+    assert {line['state'] for line in lines} == {'todo'}
+
+
+def test_export_todos_csv(session, client, register_user, token):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=register_user.id, title='Title')
+    )
+    session.commit()
+
+    response = client.get(
+        '/api/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [row['title'] for row in rows] == ['Title', 'Title']
+    assert list(rows[0]) == [
+        'title',
+        'description',
+        'state',
+        'id',
+        'created_at',
+        'updated_at',
+    ]
+
+
+def test_export_todos_csv_without_todos_should_return_header(client, token):
+    response = client.get(
+        '/api/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.text.strip() == (
+        'title,description,state,id,created_at,updated_at'
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_todos_with_async_session(async_client, user_data):
+    await async_client.post('/api/users/', json=user_data)
+    response = await async_client.post(
+        '/api/auth/token',
+        data={
+            'username': user_data['username'],
+            'password': user_data['password'],
+        },
+    )
+    headers = {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+    await async_client.post(
+        '/api/todos/batch',
+        headers=headers,
+        json={
+            'todos': [
+                {'title': 'First', 'description': 'a', 'state': 'draft'},
+                {'title': 'Second', 'description': 'b', 'state': 'todo'},
+            ]
+        },
+    )
+
+    response = await async_client.get('/api/todos/export', headers=headers)
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert [line['title'] for line in lines] == ['First', 'Second']
+
+
+def test_list_todos_etag_should_return_not_modified(
+    session, client, register_user, token
+):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=register_user.id)
+    )
+    session.commit()
+
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/api/todos', headers=headers)
+    etag = response.headers['etag']
+
+    cached = client.get('/api/todos', headers={**headers, 'If-None-Match': etag})
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers['etag'] == etag
+    assert not cached.content
+
+
+def test_list_todos_etag_should_change_after_write(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/api/todos', headers=headers).headers['etag']
+
+    client.post(
+        '/api/todos',
+        headers=headers,
+        json={'title': 'New', 'description': 'New', 'state': 'draft'},
+    )
+
+    response = client.get(
+        '/api/todos', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
+    assert len(response.json()['todos']) == 1
+
+
+def test_list_todos_etag_should_depend_on_filters(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/api/todos', headers=headers).headers['etag']
+
+    response = client.get(
+        '/api/todos?state=done', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_list_todos_should_be_served_from_cache(
+    session, client, register_user, token, todo_list_cache
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get('/api/todos', headers=headers)
+
+    # Escrita fora da API não invalida o cache
+    session.add(TodoFactory(user_id=register_user.id))
+    session.commit()
+
+    second = client.get('/api/todos', headers=headers)
+
+    assert first.json() == {'todos': [], 'next_cursor': None}
+    assert second.content == first.content
+    assert second.headers['etag'] == first.headers['etag']
+
+
+def test_list_todos_cache_should_answer_if_none_match(
+    client, token, todo_list_cache
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/api/todos', headers=headers).headers['etag']
+
+    response = client.get(
+        '/api/todos', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_list_todos_cache_should_be_invalidated_by_writes(
+    client, token, todo_list_cache
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/todos', headers=headers)
+
+    created = client.post(
+        '/api/todos',
+        headers=headers,
+        json={'title': 'New', 'description': 'New', 'state': 'draft'},
+    ).json()
+    after_create = client.get('/api/todos', headers=headers).json()
+
+    client.patch(
+        f'/api/todos/{created["id"]}', headers=headers, json={'title': 'Edited'}
+    )
+    after_update = client.get('/api/todos', headers=headers).json()
+
+    client.delete(f'/api/todos/{created["id"]}', headers=headers)
+    after_delete = client.get('/api/todos', headers=headers).json()
+
+    assert [todo['title'] for todo in after_create['todos']] == ['New']
+    assert [todo['title'] for todo in after_update['todos']] == ['Edited']
+    assert after_delete['todos'] == []
+
+
+def test_list_todos_fast_json_should_match_default(
+    session, client, register_user, token, monkeypatch
+):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(3, user_id=register_user.id)
+    )
+    session.commit()
+
+    headers = {'Authorization': f'Bearer {token}'}
+    default = client.get('/api/todos', headers=headers)
+
+    monkeypatch.setattr(get_settings(), 'FAST_JSON_RESPONSES', True)
+    fast = client.get('/api/todos', headers=headers)
+
+    assert fast.status_code == HTTPStatus.OK
+    assert fast.headers['content-type'] == 'application/json'
+    assert fast.headers['etag'] == default.headers['etag']
+    assert fast.json() == default.json()
+
+
+def test_summary_should_follow_writes(session, client, register_user, token):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(
+            3, user_id=register_user.id, state=TodoState.draft
+        )
+    )
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    todos = client.get('/api/todos/', headers=headers).json()['todos']
+
+    client.patch(
+        f'/api/todos/{todos[0]["id"]}', headers=headers, json={'state': 'done'}
+    )
+    client.delete(f'/api/todos/{todos[1]["id"]}', headers=headers)
+    client.post(
+        '/api/todos/batch',
+        headers=headers,
+        json={
+            'todos': [
+                {'title': 'a', 'description': 'a', 'state': 'doing'},
+                {'title': 'b', 'description': 'b', 'state': 'doing'},
+            ]
+        },
+    )
+
+    response = client.get('/api/todos/summary', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'draft': 1,
+        'todo': 0,
+        'doing': 2,
+        'done': 1,
+        'trash': 1,
+        'total': 4,
+    }
+
+
+def test_summary_should_be_scoped_to_user(
+    session, client, register_other_user, token
+):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=register_other_user.id)
+    )
+    session.commit()
+
+    response = client.get(
+        '/api/todos/summary', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json()['total'] == 0
+
+
+def age_todos(session, hours=1):
+    # Grava no mesmo formato do CURRENT_TIMESTAMP usado pelo banco
+    session.execute(
+        update(Todo).values(updated_at=func.datetime('now', f'-{hours} hours'))
+    )
+    session.commit()
+
+
+def test_changes_should_return_only_todos_after_cursor(
+    session, client, register_user, token
+):
+    expected_todos = 3
+    session.bulk_save_objects(
+        TodoFactory.create_batch(3, user_id=register_user.id)
+    )
+    session.commit()
+    age_todos(session)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/api/todos/changes', headers=headers).json()
+    cursor = first['next_cursor']
+    unchanged = client.get(
+        '/api/todos/changes', headers=headers, params={'cursor': cursor}
+    ).json()
+
+    updated_id = first['todos'][0]['id']
+    client.patch(
+        f'/api/todos/{updated_id}', headers=headers, json={'title': 'new'}
+    )
+    changed = client.get(
+        '/api/todos/changes', headers=headers, params={'cursor': cursor}
+    ).json()
+
+    assert len(first['todos']) == expected_todos
+    assert unchanged['todos'] == []
+    assert [todo['id'] for todo in changed['todos']] == [updated_id]
+    assert changed['todos'][0]['title'] == 'new'
+
+
+def test_changes_should_resend_recent_window(
+    session, client, register_user, token
+):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=register_user.id)
+    )
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/api/todos/changes', headers=headers).json()
+    again = client.get(
+        '/api/todos/changes',
+        headers=headers,
+        params={'cursor': first['next_cursor']},
+    ).json()
+
+    # Alterações dos últimos SYNC_SETTLE_SECONDS são reenviadas
+    assert again['todos'] == first['todos']
+
+
+def test_changes_should_report_trashed_todos(
+    session, client, register_user, token
+):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(3, user_id=register_user.id)
+    )
+    session.commit()
+    age_todos(session)
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get('/api/todos/changes', headers=headers).json()
+    ids = [todo['id'] for todo in first['todos']]
+
+    client.delete(f'/api/todos/{ids[0]}', headers=headers)
+    client.post(
+        '/api/todos/batch/delete', headers=headers, json={'ids': [ids[1]]}
+    )
+
+    changes = client.get(
+        '/api/todos/changes',
+        headers=headers,
+        params={'cursor': first['next_cursor']},
+    ).json()
+
+    assert sorted(todo['id'] for todo in changes['todos']) == ids[:2]
+    assert {todo['state'] for todo in changes['todos']} == {'trash'}
+    assert changes['deleted'] == []
+
+
+def test_changes_should_report_purged_ids(session, client, register_user, token):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(3, user_id=register_user.id)
+    )
+    session.commit()
+    age_todos(session)
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get('/api/todos/changes', headers=headers).json()
+    ids = [todo['id'] for todo in first['todos']]
+
+    session.execute(delete(Todo).where(Todo.id.in_(ids[:2])))
+    session.commit()
+
+    changes = client.get(
+        '/api/todos/changes',
+        headers=headers,
+        params={'cursor': first['next_cursor']},
+    ).json()
+
+    assert changes['todos'] == []
+    assert sorted(changes['deleted']) == ids[:2]
+
+
+def test_changes_should_page_with_keyset(session, client, register_user, token):
+    expected_todos = 3
+    session.bulk_save_objects(
+        TodoFactory.create_batch(3, user_id=register_user.id)
+    )
+    session.commit()
+    age_todos(session)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get(
+        '/api/todos/changes', headers=headers, params={'limit': 2}
+    ).json()
+    second = client.get(
+        '/api/todos/changes',
+        headers=headers,
+        params={'limit': 2, 'cursor': first['next_cursor']},
+    ).json()
+
+    assert first['has_more']
+    assert not second['has_more']
+    assert len(first['todos'] + second['todos']) == expected_todos
+
+
+def test_changes_invalid_cursor(client, token):
+    response = client.get(
+        '/api/todos/changes',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'cursor': encode_cursor({'todos': ['not a date', 1]})},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+import pytest
+
 from fast_zero.schemas import UserPublic
 
 
@@ -17,6 +19,22 @@ def test_create_user(client, user_data):
     }
 
 
+@pytest.mark.asyncio
+async def test_create_and_read_user_with_async_session(async_client, user_data):
+    response = await async_client.post('/api/users/', json=user_data)
+
+    assert response.status_code == HTTPStatus.CREATED
+
+    response = await async_client.get(f'/api/users/{response.json()["id"]}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'id': 1,
+        'email': user_data['email'],
+        'username': user_data['username'],
+    }
+
+
 def test_create_user_with_same_username(client, register_user):
     response = client.post(
         '/api/users',
@@ -70,6 +88,35 @@ def test_read_user_with_user(client, register_user):
     }
 
 
+def test_read_user_etag_should_return_not_modified(client, register_user):
+    response = client.get(f'/api/users/{register_user.id}')
+
+    cached = client.get(
+        f'/api/users/{register_user.id}',
+        headers={'If-None-Match': response.headers['etag']},
+    )
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert not cached.content
+
+
+def test_read_user_if_modified_since(client, register_user):
+    response = client.get(f'/api/users/{register_user.id}')
+    last_modified = response.headers['last-modified']
+
+    cached = client.get(
+        f'/api/users/{register_user.id}',
+        headers={'If-Modified-Since': last_modified},
+    )
+    stale = client.get(
+        f'/api/users/{register_user.id}',
+        headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'},
+    )
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert stale.status_code == HTTPStatus.OK
+
+
 def test_read_user_nao_encontrado_deve_retornar_not_found(client):
     response = client.get('/api/users/150')
 
@@ -143,3 +190,62 @@ def test_delete_user_com_usuario_errado(
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permission'}
+
+
+@pytest.mark.usefixtures('fast_json')
+def test_read_users_fast_json(client, register_user):
+    user_schema = UserPublic.model_validate(register_user).model_dump()
+    response = client.get('/api/users')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/json'
+    assert response.json() == {'users': [user_schema]}
+
+
+def test_deleted_user_should_be_hidden_until_purged(
+    session, client, register_user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.delete(f'/api/users/{register_user.id}', headers=headers)
+
+    login = client.post(
+        '/api/auth/token',
+        data={
+            'username': register_user.username,
+            'password': register_user.clean_password,
+        },
+    )
+
+    session.refresh(register_user)
+
+    assert register_user.deleted_at is not None
+    assert client.get('/api/todos/', headers=headers).status_code == (
+        HTTPStatus.UNAUTHORIZED
+    )
+    assert login.status_code == HTTPStatus.BAD_REQUEST
+    assert client.get(f'/api/users/{register_user.id}').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get('/api/users/').json() == {'users': []}
+
+
+def test_deleted_user_should_free_username_and_email(
+    client, register_user, token
+):
+    username, email = register_user.username, register_user.email
+    client.delete(
+        f'/api/users/{register_user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    response = client.post(
+        '/api/users/',
+        json={'username': username, 'email': email, 'password': 'secret'},
+    )
+    login = client.post(
+        '/api/auth/token', data={'username': username, 'password': 'secret'}
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['id'] != register_user.id
+    assert login.status_code == HTTPStatus.OK
@@ -0,0 +1,90 @@
+import pytest
+from freezegun import freeze_time
+
+from fast_zero.cache import MemoryBackend, TodoListCache, TTLCache
+from fast_zero.schemas import TodoFilters
+
+
+def test_ttl_cache_get_counts_hits_and_misses():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 'c')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 'c'
+
+
+def test_ttl_cache_expires_entries():
+    with freeze_time('2025-03-11 12:00:00') as frozen:
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 'b', ttl=120)
+
+        frozen.tick(61)
+
+        assert cache.get('a') is None
+        assert cache.get('b') == 'b'
+        assert len(cache) == 1
+
+
+def test_ttl_cache_disabled_with_zero_size():
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.get('a') is None
+
+
+def test_ttl_cache_pop():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a') is None
+
+
+@pytest.mark.asyncio
+async def test_todo_list_cache_invalidate_changes_keys():
+    cache = TodoListCache(MemoryBackend(maxsize=10), ttl=60)
+    filters = TodoFilters()
+
+    key, cached = await cache.lookup(1, filters)
+    await cache.store(key, 'W/"etag"', b'{}')
+
+    assert (await cache.lookup(1, filters))[1] == ('W/"etag"', b'{}')
+    assert (await cache.lookup(2, filters))[1] is None
+
+    await cache.invalidate(1)
+
+    new_key, cached = await cache.lookup(1, filters)
+
+    assert cached is None
+    assert new_key != key
+
+
+@pytest.mark.asyncio
+async def test_todo_list_cache_skips_store_when_generation_races():
+    backend = MemoryBackend(maxsize=10)
+    cache = TodoListCache(backend, ttl=60)
+    original_get = backend.get
+
+    async def get_then_invalidate(key):
+        value = await original_get(key)
+        # Uma escrita concorrente define a geração logo após a leitura
+        await cache.invalidate(1)
+        return value
+
+    backend.get = get_then_invalidate
+
+    assert await cache.lookup(1, TodoFilters()) == (None, None)
@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from fast_zero.counters import check_todo_counts, main, rebuild_todo_counts
+from fast_zero.models import TodoCount, TodoState, TodoVersion, table_registry
+from fast_zero.settings import get_settings
+from tests.conftest import TodoFactory, UserFactory
+
+
+def test_triggers_should_keep_counts_in_sync(session, register_user):
+    todos = TodoFactory.create_batch(
+        4, user_id=register_user.id, state=TodoState.todo
+    )
+    session.add_all(todos)
+    session.commit()
+
+    todos[0].state = TodoState.done
+    session.delete(todos[1])
+    session.commit()
+
+    assert check_todo_counts(session) == []
+
+
+def test_triggers_should_bump_version_on_every_write(session, register_user):
+    expected_version = 4
+    todos = TodoFactory.create_batch(2, user_id=register_user.id)
+    session.add_all(todos)
+    session.commit()
+
+    todos[0].title = 'renamed'
+    session.delete(todos[1])
+    session.commit()
+
+    assert session.get(TodoVersion, register_user.id).version == expected_version
+
+
+def test_rebuild_should_fix_drifted_counts(session, register_user):
+    session.add_all(TodoFactory.create_batch(2, user_id=register_user.id))
+    session.commit()
+    session.execute(update(TodoCount).values(count=TodoCount.count + 10))
+
+    assert len(check_todo_counts(session)) > 0
+
+    rebuild_todo_counts(session)
+
+    assert check_todo_counts(session) == []
+
+
+def test_main_should_report_and_rebuild(tmp_path, monkeypatch, capsys):
+    url = f'sqlite:///{tmp_path}/counters.db'
+    engine = create_engine(url)
+    table_registry.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        user = UserFactory()
+        session.add(user)
+        session.flush()
+        session.add(TodoFactory(user_id=user.id, state=TodoState.draft))
+        session.flush()
+        session.execute(update(TodoCount).values(count=0))
+        session.commit()
+
+    engine.dispose()
+    monkeypatch.setattr(get_settings(), 'DATABASE_URL', url)
+
+    assert main(['check']) == 1
+    assert 'user 1 draft: counter 0, actual 1' in capsys.readouterr().out
+    assert main(['rebuild']) == 0
+    assert main(['check']) == 0
@@ -1,10 +1,36 @@
+import subprocess
+import sys
 from dataclasses import asdict
 from datetime import datetime
+from http import HTTPStatus
 
-from sqlalchemy import select
+import pytest
+from sqlalchemy import create_engine, make_url, select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from fast_zero.app import app
+from fast_zero.database import (
+    MeteredQueuePool,
+    get_engine_options,
+    get_session,
+    pool_metrics,
+)
 from fast_zero.models import User
 
+# Só o `models`: os triggers não podem depender dos routers terem sido importados
+CREATE_ALL_WITH_MODELS = """
+from sqlalchemy import create_engine, text
+from fast_zero.models import table_registry
+
+engine = create_engine('sqlite://')
+table_registry.metadata.create_all(engine)
+
+with engine.connect() as connection:
+    print(*connection.scalars(text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+    )))
+"""
+
 
 def test_create_user(session, mock_db_time):
     with mock_db_time(model=User, time=datetime(2025, 2, 23)) as time:
@@ -24,4 +50,91 @@ def test_create_user(session, mock_db_time):
         'email': 'email@test.com',
         'created_at': time,
         'updated_at': time,
+        'deleted_at': None,
     }
+
+
+@pytest.mark.asyncio
+async def test_create_user_async_session(async_session):
+    user = User(
+        username='user_test', email='email@test.com', password='password_test'
+    )
+
+    async_session.add(user)
+    await async_session.commit()
+
+    result = await async_session.scalar(
+        select(User).where(User.username == 'user_test')
+    )
+
+    assert result.id == 1
+    assert result.email == 'email@test.com'
+
+
+def test_engine_options_keep_default_pool_for_sqlite_memory():
+    assert get_engine_options(make_url('sqlite://'), is_async=False) == {}
+
+
+def test_engine_options_use_metered_pool():
+    options = get_engine_options(
+        make_url('sqlite:///database.db'), is_async=False
+    )
+
+    assert options['poolclass'] is MeteredQueuePool
+    assert 'connect_args' not in options
+
+
+def test_pool_exhaustion_records_timeout(tmp_path):
+    engine = create_engine(
+        f'sqlite:///{tmp_path / "pool.db"}',
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    checkouts = pool_metrics.checkouts
+    timeouts = pool_metrics.timeouts
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    assert pool_metrics.checkouts == checkouts + 1
+    assert pool_metrics.timeouts == timeouts + 1
+
+    engine.dispose()
+
+
+def test_pool_timeout_returns_service_unavailable(client):
+    def get_session_override():
+        raise PoolTimeoutError
+
+    app.dependency_overrides[get_session] = get_session_override
+
+    response = client.get('/api/users/1')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '1'
+
+
+def test_create_all_should_create_triggers_with_models_only():
+    result = subprocess.run(
+        [sys.executable, '-c', CREATE_ALL_WITH_MODELS],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == [
+        'todo_counts_ad',
+        'todo_counts_ai',
+        'todo_counts_au',
+        'todo_tombstones_ad',
+        'todo_tombstones_ai',
+        'todo_versions_ad',
+        'todo_versions_ai',
+        'todo_versions_au',
+        'todos_fts_ad',
+        'todos_fts_ai',
+        'todos_fts_au',
+    ]
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero.events import (
+    RESYNC_EVENT,
+    LocalBroker,
+    RedisBroker,
+    event_stream,
+)
+from fast_zero.models import User
+from fast_zero.routers.todos import stream_todo_events
+from tests.conftest import FakeRedis
+
+
+@pytest.mark.asyncio
+async def test_local_broker_should_fan_out_per_user():
+    broker = LocalBroker(queue_size=10)
+    first = broker.subscribe(1)
+    second = broker.subscribe(1)
+    other = broker.subscribe(2)
+
+    await broker.publish(1, {'type': 'created'})
+
+    assert await first.get() == {'type': 'created'}
+    assert await second.get() == {'type': 'created'}
+    assert other.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_should_get_single_resync():
+    broker = LocalBroker(queue_size=2)
+    subscription = broker.subscribe(1)
+
+    for _ in range(5):
+        await broker.publish(1, {'type': 'updated'})
+
+    assert await subscription.get() == RESYNC_EVENT
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_should_stop_delivery():
+    broker = LocalBroker(queue_size=10)
+    subscription = broker.subscribe(1)
+    broker.unsubscribe(1, subscription)
+
+    await broker.publish(1, {'type': 'created'})
+
+    assert subscription.queue.empty()
+    assert broker.subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_broker_should_share_events_between_workers():
+    redis = FakeRedis()
+    publisher = RedisBroker(redis, queue_size=10)
+    subscriber = RedisBroker(redis, queue_size=10)
+    subscription = subscriber.subscribe(1)
+    await asyncio.sleep(0)  # listener assina o padrão
+
+    await publisher.publish(1, {'type': 'deleted', 'ids': [3]})
+
+    event = await asyncio.wait_for(subscription.get(), 1)
+    subscriber._listener.cancel()
+
+    assert event == {'type': 'deleted', 'ids': [3]}
+
+
+@pytest.mark.asyncio
+async def test_event_stream_should_format_sse_and_keepalive():
+    broker = LocalBroker(queue_size=10)
+    subscription = broker.subscribe(1)
+    stream = event_stream(subscription, keepalive=0.01)
+
+    assert await anext(stream) == ': connected\n\n'
+    assert await anext(stream) == ': keep-alive\n\n'
+
+    await broker.publish(1, {'type': 'deleted', 'ids': [1]})
+
+    assert await anext(stream) == (
+        f'event: deleted\ndata: {json.dumps({"type": "deleted", "ids": [1]})}\n\n'
+    )
+
+
+def test_todo_writes_should_publish_events(broker, client, register_user, token):
+    subscription = broker.subscribe(register_user.id)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    created = client.post(
+        '/api/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'b', 'state': 'draft'},
+    ).json()
+    client.patch(
+        f'/api/todos/{created["id"]}', headers=headers, json={'state': 'done'}
+    )
+    response = client.delete(f'/api/todos/{created["id"]}', headers=headers)
+
+    events = [subscription.queue.get_nowait() for _ in range(3)]
+
+    assert response.status_code == HTTPStatus.OK
+    assert [event['type'] for event in events] == [
+        'created',
+        'updated',
+        'deleted',
+    ]
+    assert events[0]['todos'][0]['title'] == 'a'
+    assert events[1]['todos'][0]['state'] == 'done'
+    assert events[2]['ids'] == [created['id']]
+
+
+def test_batch_writes_should_publish_one_event_each(
+    broker, client, register_user, token
+):
+    subscription = broker.subscribe(register_user.id)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    results = client.post(
+        '/api/todos/batch',
+        headers=headers,
+        json={
+            'todos': [
+                {'title': 'a', 'description': 'a', 'state': 'draft'},
+                {'title': 'b', 'description': 'b', 'state': 'draft'},
+            ]
+        },
+    ).json()['results']
+    ids = [result['id'] for result in results]
+    client.post('/api/todos/batch/delete', headers=headers, json={'ids': ids})
+
+    created = subscription.queue.get_nowait()
+    deleted = subscription.queue.get_nowait()
+
+    assert [todo['id'] for todo in created['todos']] == ids
+    assert deleted == {'type': 'deleted', 'ids': ids}
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_should_stream_and_unsubscribe(
+    broker, async_session
+):
+    user = User(username='user', email='user@email.com', password='x')
+    async_session.add(user)
+    await async_session.commit()
+
+    response = await stream_todo_events(session=async_session, user=user)
+    chunks = response.body_iterator
+
+    assert response.media_type == 'text/event-stream'
+    assert await anext(chunks) == ': connected\n\n'
+
+    await broker.publish(user.id, {'type': 'deleted', 'ids': [1]})
+
+    assert (await anext(chunks)).startswith('event: deleted\n')
+
+    await chunks.aclose()
+
+    assert broker.subscriptions == {}
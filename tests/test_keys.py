@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from jwt import get_unverified_header
+from jwt.exceptions import InvalidKeyError
+
+from fast_zero.keys import KeySet, generate_jwk
+from fast_zero.security import create_access_token, get_token_subject
+
+
+@pytest.fixture
+def key_set(monkeypatch):
+    key_set = KeySet(
+        {
+            'keys': [
+                generate_jwk('2025-01', algorithm='RS256'),
+                generate_jwk('2025-02', algorithm='EdDSA'),
+            ]
+        },
+        signing_kid='2025-02',
+    )
+    monkeypatch.setattr('fast_zero.security.get_key_set', lambda: key_set)
+    monkeypatch.setattr('fast_zero.routers.auth.get_key_set', lambda: key_set)
+
+    return key_set
+
+
+def test_token_is_signed_with_current_kid(key_set):
+    token = create_access_token({'sub': 'test_username'})
+
+    assert get_unverified_header(token) == {
+        'alg': 'EdDSA',
+        'kid': '2025-02',
+        'typ': 'JWT',
+    }
+    assert get_token_subject(token) == 'test_username'
+
+
+def test_rotated_keys_keep_verifying_old_tokens(key_set):
+    key_set.signing_kid = '2025-01'
+    old_token = create_access_token({'sub': 'old'})
+
+    key_set.signing_kid = '2025-02'
+    new_token = create_access_token({'sub': 'new'})
+
+    assert get_token_subject(old_token) == 'old'
+    assert get_token_subject(new_token) == 'new'
+
+
+def test_verifier_only_needs_public_keys(key_set, monkeypatch):
+    token = create_access_token({'sub': 'test_username'})
+
+    verifier = KeySet(key_set.public_jwks())
+    monkeypatch.setattr('fast_zero.security.get_key_set', lambda: verifier)
+
+    assert get_token_subject(token) == 'test_username'
+
+    with pytest.raises(InvalidKeyError):
+        verifier.signing_key()
+
+
+def test_unknown_kid_is_rejected(key_set):
+    token = create_access_token({'sub': 'test_username'})
+    del key_set.public_keys['2025-02']
+
+    with pytest.raises(InvalidKeyError):
+        get_token_subject(token)
+
+
+def test_read_jwks_exposes_only_public_keys(client, key_set):
+    response = client.get('/api/auth/jwks')
+
+    keys = response.json()['keys']
+
+    assert response.status_code == HTTPStatus.OK
+    assert [key['kid'] for key in keys] == ['2025-01', '2025-02']
+    assert all('d' not in key for key in keys)
+
+
+def test_read_jwks_without_key_set(client):
+    response = client.get('/api/auth/jwks')
+
+    assert response.json() == {'keys': []}
@@ -0,0 +1,107 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero.metrics import Histogram, Metrics, parameter_shape
+from fast_zero.settings import get_settings
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = Metrics()
+
+    monkeypatch.setattr(get_settings(), 'METRICS_ENABLED', True)
+    monkeypatch.setattr('fast_zero.metrics.metrics', metrics)
+    monkeypatch.setattr('fast_zero.app.metrics', metrics)
+
+    return metrics
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram((0.1, 1))
+    histogram.observe(('GET',), 0.05)
+    histogram.observe(('GET',), 0.5)
+    histogram.observe(('GET',), 3)
+
+    assert histogram.render('latency', ('method',)) == [
+        '# TYPE latency histogram',
+        'latency_bucket{method="GET",le="0.1"} 1',
+        'latency_bucket{method="GET",le="1"} 2',
+        'latency_bucket{method="GET",le="+Inf"} 3',
+        'latency_sum{method="GET"} 3.55',
+        'latency_count{method="GET"} 3',
+    ]
+
+
+def test_metrics_disabled_by_default(client):
+    response = client.get('/')
+
+    assert 'server-timing' not in response.headers
+    assert client.get('/metrics').status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.usefixtures('metrics')
+def test_server_timing_should_count_statements(client, token):
+    response = client.get(
+        '/api/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    timing = response.headers['server-timing']
+    statements = re.search(r'desc="(\d+) statements"', timing).group(1)
+
+    assert timing.startswith('app;dur=')
+    assert int(statements) > 0
+
+
+@pytest.mark.usefixtures('metrics')
+def test_metrics_endpoint_should_group_by_route_template(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/users/1', headers=headers)
+    client.get('/api/users/2', headers=headers)
+    client.get('/does-not-exist')
+
+    text = client.get('/metrics').text
+
+    assert (
+        'http_request_duration_seconds_count'
+        '{method="GET",route="/api/users/{user_id}",status="200"} 1'
+    ) in text
+    assert (
+        'http_request_duration_seconds_count'
+        '{method="GET",route="/api/users/{user_id}",status="404"} 1'
+    ) in text
+    assert 'route="<unmatched>"' in text
+    assert 'db_pool_checkouts' in text
+    assert 'cache_hits{cache="principal"}' in text
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('metrics')
+async def test_server_timing_should_count_async_statements(async_client):
+    response = await async_client.get('/api/users/')
+
+    assert 'desc="1 statements"' in response.headers['server-timing']
+
+
+def test_parameter_shape_should_hide_values():
+    assert parameter_shape(('secret', 1)) == ['str', 'int']
+    assert parameter_shape({'email': 'a@b.com'}) == {'email': 'str'}
+    assert parameter_shape([(1,), (2,)], many=True) == "2 x ['int']"
+
+
+def test_slow_query_should_log_statement_and_route(
+    client, register_user, monkeypatch, caplog
+):
+    monkeypatch.setattr(get_settings(), 'SLOW_QUERY_THRESHOLD_MS', 0)
+
+    with caplog.at_level(logging.WARNING, logger='fast_zero.metrics'):
+        client.get('/api/users/')
+
+    [message] = [record.getMessage() for record in caplog.records]
+
+    assert 'route=/api/users/ ' in message
+    assert "params=['int', 'int']" in message
+    assert 'FROM users WHERE users.deleted_at IS NULL LIMIT ? OFFSET ?' in message
+    assert register_user.email not in message
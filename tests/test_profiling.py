@@ -0,0 +1,77 @@
+from threading import get_ident
+from time import perf_counter
+from types import SimpleNamespace
+
+import pytest
+
+from fast_zero.profiling import StackSampler, finish_sampler, start_sampler
+from fast_zero.settings import get_settings
+
+
+def busy_wait(seconds: float):
+    deadline = perf_counter() + seconds
+    while perf_counter() < deadline:
+        pass
+
+
+def test_stack_sampler_should_fold_stacks():
+    sampler = StackSampler(interval=0.001).start()
+    busy_wait(0.05)
+    sampler.stop()
+
+    assert sampler.stacks
+    assert any(
+        stack.endswith(
+            f'busy_wait ({__file__}:{busy_wait.__code__.co_firstlineno})'
+        )
+        for stack in sampler.stacks
+    )
+
+
+def test_start_sampler_should_sample_one_in_n():
+    settings = SimpleNamespace(PROFILE_SAMPLE_RATE=2, PROFILE_INTERVAL_MS=1)
+    samplers = [start_sampler(settings) for _ in range(4)]
+
+    for sampler in filter(None, samplers):
+        sampler.stop()
+
+    assert sum(sampler is not None for sampler in samplers) == len(samplers) // 2
+
+
+def test_start_sampler_disabled():
+    assert start_sampler(SimpleNamespace(PROFILE_SAMPLE_RATE=0)) is None
+
+
+@pytest.mark.parametrize(('budget_ms', 'dumped'), [(0, True), (60_000, False)])
+def test_slow_request_should_dump_stacks(
+    client, monkeypatch, tmp_path, budget_ms, dumped
+):
+    settings = get_settings()
+    monkeypatch.setattr(settings, 'PROFILE_SAMPLE_RATE', 1)
+    monkeypatch.setattr(settings, 'PROFILE_BUDGET_MS', budget_ms)
+    monkeypatch.setattr(settings, 'PROFILE_OUTPUT_DIR', str(tmp_path))
+
+    client.get('/')
+
+    assert bool(list(tmp_path.glob('*-GET.folded'))) is dumped
+
+
+def test_sampler_should_finish_off_the_event_loop(client, monkeypatch, tmp_path):
+    settings = get_settings()
+    monkeypatch.setattr(settings, 'PROFILE_SAMPLE_RATE', 1)
+    monkeypatch.setattr(settings, 'PROFILE_OUTPUT_DIR', str(tmp_path))
+    threads = []
+
+    def recording_finish(sampler, *args):
+        # O sampler guarda a thread que amostra: a do event loop
+        threads.append((sampler.thread_id, get_ident()))
+
+        return finish_sampler(sampler, *args)
+
+    monkeypatch.setattr('fast_zero.metrics.finish_sampler', recording_finish)
+
+    client.get('/')
+
+    [(loop_thread, finish_thread)] = threads
+
+    assert finish_thread != loop_thread
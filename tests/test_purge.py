@@ -0,0 +1,78 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select, update
+
+from fast_zero.models import Todo, TodoCount, TodoState, User
+from fast_zero.purge import purge_deleted_user, purge_once, purge_trash
+from tests.conftest import TodoFactory, UserFactory
+
+
+async def add_user_with_todos(session, todos, **kwargs):
+    user = UserFactory()
+    session.add(user)
+    await session.flush()
+    session.add_all(TodoFactory.create_batch(todos, user_id=user.id, **kwargs))
+    await session.commit()
+
+    return user
+
+
+@pytest.mark.asyncio
+async def test_purge_trash_should_delete_old_trash_in_batches(async_session):
+    batch_size = 2
+    user = await add_user_with_todos(async_session, 3, state=TodoState.trash)
+    # Mesmo formato do CURRENT_TIMESTAMP gravado pelo banco
+    await async_session.execute(
+        update(Todo).values(updated_at=func.datetime('now', '-1 hours'))
+    )
+    async_session.add_all([
+        TodoFactory(user_id=user.id, state=TodoState.trash),
+        TodoFactory(user_id=user.id, state=TodoState.todo),
+    ])
+    await async_session.commit()
+    older_than = timedelta(minutes=1)
+
+    purged = [
+        await purge_trash(async_session, batch_size, older_than) for _ in range(3)
+    ]
+    remaining = await async_session.scalars(select(Todo.state))
+
+    assert purged == [2, 1, 0]
+    assert sorted(remaining.all()) == [TodoState.todo, TodoState.trash]
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_user_should_remove_todos_then_user(async_session):
+    batch_size = 2
+    user = await add_user_with_todos(async_session, 3)
+    other_user = await add_user_with_todos(async_session, 1)
+    user.deleted_at = func.now()
+    await async_session.commit()
+
+    purged = [
+        await purge_deleted_user(async_session, batch_size) for _ in range(4)
+    ]
+    users = await async_session.scalars(select(User.id))
+    counts = await async_session.scalars(select(TodoCount.user_id))
+
+    assert purged == [2, 1, 1, 0]
+    assert users.all() == [other_user.id]
+    assert set(counts.all()) == {other_user.id}
+
+
+@pytest.mark.asyncio
+async def test_purge_once_should_not_postpone_users_behind_trash(async_session):
+    settings = SimpleNamespace(PURGE_BATCH_SIZE=1, PURGE_TRASH_AFTER_SECONDS=0)
+    await add_user_with_todos(async_session, 3, state=TodoState.trash)
+    deleted_user = await add_user_with_todos(async_session, 0)
+    deleted_user.deleted_at = func.now()
+    await async_session.commit()
+
+    purged = await purge_once(async_session, settings)
+    users = await async_session.scalars(select(User.id))
+
+    # Um todo da lixeira e, no mesmo ciclo, o usuário removido
+    assert purged == 1 + 1
+    assert deleted_user.id not in users.all()
@@ -0,0 +1,104 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from fast_zero.replicas import ReplicaSet, get_replica_set
+from fast_zero.settings import get_settings
+from tests.conftest import TodoFactory, UserFactory
+
+
+def add_user(url, username):
+    engine = create_engine(url)
+
+    with Session(engine) as session:
+        session.add(UserFactory(username=username))
+        session.commit()
+
+    engine.dispose()
+
+
+def list_usernames(client, **kwargs):
+    response = client.get('/api/users/', **kwargs)
+
+    return [user['username'] for user in response.json()['users']]
+
+
+def test_reads_should_rotate_between_replicas(client, replica_urls):
+    for number, url in enumerate(replica_urls):
+        add_user(url, f'replica{number}')
+
+    reads = [list_usernames(client) for _ in range(4)]
+
+    assert sorted(reads[:2]) == [['replica0'], ['replica1']]
+    assert reads[2:] == reads[:2]
+
+
+def test_writes_should_pin_client_to_primary(client, user_data, replica_urls):
+    client.post('/api/users/', json=user_data)
+
+    assert list_usernames(client) == [user_data['username']]
+
+
+def test_writes_should_pin_user_to_primary(
+    session, client, register_user, token, replica_urls
+):
+    expected_todos = 2
+    session.add(TodoFactory(user_id=register_user.id))
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert client.get('/api/todos/', headers=headers).json()['todos'] == []
+
+    client.post(
+        '/api/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'a', 'state': 'draft'},
+    )
+    response = client.get('/api/todos/', headers=headers)
+
+    assert len(response.json()['todos']) == expected_todos
+
+
+def test_unavailable_replica_should_fall_back_to_primary(
+    client, register_user, tmp_path, replica_urls, monkeypatch
+):
+    monkeypatch.setattr(
+        get_settings(),
+        'DATABASE_REPLICA_URLS',
+        f'sqlite:///{tmp_path}/missing/replica.db',
+    )
+    get_replica_set.cache_clear()
+
+    assert list_usernames(client) == [register_user.username]
+    assert get_replica_set().health() == [False]
+
+
+def test_candidates_should_skip_replicas_marked_down():
+    engines = [create_engine('sqlite://') for _ in range(3)]
+    replicas = ReplicaSet(engines, retry_seconds=60)
+
+    replicas.mark_down(1)
+
+    assert [index for index, _ in replicas.candidates()] == [0, 2]
+    assert [index for index, _ in replicas.candidates()] == [2, 0]
+
+
+def test_replica_pages_should_not_be_cached(
+    register_user, client, token, todo_list_cache, replica_urls
+):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert client.get('/api/todos/', headers=headers).json()['todos'] == []
+
+    for url in replica_urls:
+        engine = create_engine(url)
+
+        with Session(engine) as session:
+            session.add(TodoFactory(user_id=register_user.id))
+            session.commit()
+
+        engine.dispose()
+
+    # A página vazia da primeira leitura não ficou no cache
+    response = client.get('/api/todos/', headers=headers)
+
+    assert len(response.json()['todos']) == 1
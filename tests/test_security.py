@@ -1,10 +1,26 @@
+import asyncio
 from http import HTTPStatus
+from threading import Event
+from unittest.mock import patch
 
 import pytest
 from fastapi import HTTPException
+from freezegun import freeze_time
 from jwt import decode
-
-from fast_zero.security import create_access_token, get_current_user, settings
+from jwt.exceptions import ExpiredSignatureError
+from sqlalchemy.exc import IntegrityError
+
+from fast_zero.security import (
+    HashingPool,
+    create_access_token,
+    get_current_user,
+    get_password_hash,
+    get_principal_cache,
+    get_token_cache,
+    get_token_subject,
+    verify_password,
+)
+from fast_zero.settings import get_settings
 
 
 def test_jwt():
@@ -12,6 +28,7 @@ def test_jwt():
 
     token = create_access_token(data)
 
+    settings = get_settings()
     result = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
     assert result['sub'] == data['sub']
@@ -54,6 +71,184 @@ def test_get_current_user_does_not_exists(client):
     assert response.json() == {'detail': 'Could not validate credentials'}
 
 
-def test_get_current_user_raises_http_exception():
+@pytest.mark.asyncio
+async def test_get_current_user_raises_http_exception():
     with pytest.raises(HTTPException):
-        get_current_user({})
+        await get_current_user({})
+
+
+def test_get_current_user_uses_principal_cache(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.get('/api/todos/', headers=headers)
+    client.get('/api/todos/', headers=headers)
+
+    assert get_principal_cache().stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_update_user_invalidates_principal_cache(client, register_user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.get('/api/todos/', headers=headers)
+    client.put(
+        f'/api/users/{register_user.id}',
+        headers=headers,
+        json={
+            'username': 'renamed',
+            'email': 'renamed@email.com',
+            'password': 'secret',
+        },
+    )
+
+    response = client.get('/api/todos/', headers=headers)
+
+    # O token aponta para o id, que não muda com o username
+    assert response.status_code == HTTPStatus.OK
+    assert get_principal_cache().get(register_user.id)['username'] == 'renamed'
+
+
+def test_freed_username_should_not_authenticate_as_old_account(
+    client, register_user, token
+):
+    username = register_user.username
+    client.get('/api/todos/', headers={'Authorization': f'Bearer {token}'})
+    client.put(
+        f'/api/users/{register_user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'renamed',
+            'email': 'renamed@email.com',
+            'password': 'secret',
+        },
+    )
+    client.post(
+        '/api/users/',
+        json={
+            'username': username,
+            'email': 'other@email.com',
+            'password': 'secret',
+        },
+    )
+    other_token = client.post(
+        '/api/auth/token',
+        data={'username': username, 'password': 'secret'},
+    ).json()['access_token']
+
+    response = client.put(
+        f'/api/users/{register_user.id}',
+        headers={'Authorization': f'Bearer {other_token}'},
+        json={
+            'username': 'stolen',
+            'email': 'stolen@email.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_delete_user_invalidates_principal_cache(client, register_user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.delete(f'/api/users/{register_user.id}', headers=headers)
+
+    response = client.get('/api/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def _login(async_client, username):
+    await async_client.post(
+        '/api/users/',
+        json={
+            'username': username,
+            'email': f'{username}@email.com',
+            'password': 'secret',
+        },
+    )
+    response = await async_client.post(
+        '/api/auth/token', data={'username': username, 'password': 'secret'}
+    )
+
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+@pytest.mark.asyncio
+async def test_failed_update_should_not_break_cached_principal(async_client):
+    headers = await _login(async_client, 'alice')
+    await _login(async_client, 'bob')
+    get_principal_cache().clear()
+
+    # Falha antes do commit, com o usuário da sessão já alterado
+    with patch('fast_zero.routers.users.get_hashing_pool') as get_pool:
+        get_pool.return_value.run.side_effect = HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        response = await async_client.put(
+            '/api/users/1',
+            headers=headers,
+            json={'username': 'x', 'email': 'x@email.com', 'password': 'x'},
+        )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    # Falha no commit: o rollback expira o usuário da sessão
+    with pytest.raises(IntegrityError):
+        await async_client.put(
+            '/api/users/1',
+            headers=headers,
+            json={'username': 'bob', 'email': 'x@email.com', 'password': 'x'},
+        )
+
+    response = await async_client.get('/api/todos/summary', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_password_operations():
+    pool = HashingPool(workers=1, max_pending=1)
+
+    hashed = await pool.run(get_password_hash, 'secret')
+
+    assert await pool.run(verify_password, 'secret', hashed)
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_saturated():
+    pool = HashingPool(workers=1, max_pending=1)
+    release = Event()
+
+    blocked = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(get_password_hash, 'secret')
+
+    release.set()
+    await blocked
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_get_token_subject_caches_verified_tokens():
+    token = create_access_token({'sub': 'test_username'})
+
+    with patch('fast_zero.security.decode', wraps=decode) as decode_spy:
+        assert get_token_subject(token) == 'test_username'
+        assert get_token_subject(token) == 'test_username'
+
+    assert decode_spy.call_count == 1
+    assert get_token_cache().stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_get_token_subject_cached_token_expires():
+    with freeze_time('2025-03-11 12:00:00') as frozen:
+        token = create_access_token({'sub': 'test_username'})
+        get_token_subject(token)
+
+        frozen.tick(get_settings().ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1)
+
+        with pytest.raises(ExpiredSignatureError):
+            get_token_subject(token)
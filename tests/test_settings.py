@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+from fast_zero.settings import Settings, get_settings
+
+IMPORT_APP = """
+import fast_zero.app
+from fast_zero.database import get_engine
+from fast_zero.settings import get_settings
+
+print(get_settings.cache_info().currsize, get_engine.cache_info().currsize)
+"""
+
+
+def test_get_settings_is_cached():
+    assert isinstance(get_settings(), Settings)
+    assert get_settings() is get_settings()
+
+
+def test_import_app_does_not_read_settings_or_create_engine():
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in Settings.model_fields
+    }
+    env['ENV_FILE'] = '/nonexistent/.env'
+
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_APP],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == ['0', '0']
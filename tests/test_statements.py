@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from fast_zero.models import TodoState
+from tests.conftest import TodoFactory
+
+
+@contextmanager
+def count_statements():
+    """Statements de qualquer engine: a sessão do app pode ser a assíncrona."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+
+    yield statements
+
+    event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def warm_client(client, token):
+    # Popula o cache de usuários para contar só as queries da escrita
+    client.get('/api/todos/', headers={'Authorization': f'Bearer {token}'})
+
+    return client
+
+
+@pytest.mark.parametrize(
+    ('method', 'url', 'body', 'expected_statements'),
+    [
+        (
+            'POST',
+            '/api/todos/',
+            {'title': 'title', 'description': 'desc', 'state': 'draft'},
+            1,
+        ),
+        ('PATCH', '/api/todos/{todo_id}', {'state': 'done'}, 2),
+        (
+            'POST',
+            '/api/users/',
+            {'username': 'new', 'email': 'new@email.com', 'password': 'x'},
+            2,
+        ),
+        (
+            'PUT',
+            '/api/users/{user_id}',
+            {'username': 'user', 'email': 'user@email.com', 'password': 'x'},
+            1,
+        ),
+    ],
+)
+def test_write_endpoints_statement_count(  # noqa: PLR0913, PLR0917
+    session,
+    warm_client,
+    register_user,
+    token,
+    method,
+    url,
+    body,
+    expected_statements,
+):
+    # Estado fixo: o PATCH para 'done' precisa de fato alterar a linha
+    todo = TodoFactory(user_id=register_user.id, state=TodoState.draft)
+    session.add(todo)
+    session.commit()
+
+    with count_statements() as statements:
+        response = warm_client.request(
+            method,
+            url.format(todo_id=todo.id, user_id=register_user.id),
+            headers={'Authorization': f'Bearer {token}'},
+            json=body,
+        )
+
+    assert response.status_code in {HTTPStatus.OK, HTTPStatus.CREATED}
+    assert len(statements) == expected_statements, statements
+
+
+def test_list_users_should_not_load_password(client, register_user):
+    with count_statements() as statements:
+        response = client.get('/api/users/')
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == 1
+    assert 'password' not in statements[0]